@@ -0,0 +1,288 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+import numpy as np
+import pandas as pd
+import sqlalchemy
+from sqlalchemy import create_engine, inspect, text
+import etl_metrics as em
+import etlprocess as etl
+import metadata_db as md
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class EtlBenchmark:
+
+    SHAPES = ['etl_process_data', 'wide', 'lob', 'high_cardinality']
+    PATHS = ['to_sql', 'chunked', 'bulk', 'pipelined', 'parallel']
+    SIZES = {'10k': 10000, '1m': 1000000, '10m': 10000000}
+    BULK_LOADERS = {'SQLite': 'executemany_generic', 'Postgresql': 'auto'}
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- synthetic data
+    @staticmethod
+    def generate_chunk(shape: str, start: int, rows: int, seed: int):
+        # Seeded per chunk so any row range regenerates identically regardless of chunk size.
+        rng = np.random.default_rng([seed, start])
+        ids = np.arange(start + 1, start + rows + 1, dtype=np.int64)
+
+        if shape == 'etl_process_data':
+            created = pd.Timestamp('2020-01-01') + pd.to_timedelta(rng.integers(0, 4 * 365 * 86400, rows), unit='s')
+            amount = np.round(rng.gamma(2.0, 150.0, rows), 2)
+            amount[rng.random(rows) < 0.01] = np.nan
+            return pd.DataFrame({
+                'id': ids,
+                'name': 'customer_' + pd.Series(rng.integers(0, 50000, rows)).astype(str),
+                'category': rng.choice(['retail', 'wholesale', 'online', 'partner', 'internal'], rows),
+                'amount': amount,
+                'quantity': rng.integers(1, 500, rows),
+                'status': rng.choice(['ACTIVE', 'INACTIVE', 'PENDING'], rows, p=[0.8, 0.15, 0.05]),
+                'created_at': created,
+                'updated_at': created + pd.to_timedelta(rng.integers(0, 30 * 86400, rows), unit='s'),
+            })
+
+        if shape == 'wide':
+            columns = {'id': ids}
+            for i in range(40):
+                columns[f'metric_{i:02d}'] = np.round(rng.normal(100, 25, rows), 4)
+            for i in range(20):
+                columns[f'attr_{i:02d}'] = rng.choice([f'value_{j}' for j in range(50)], rows)
+            return pd.DataFrame(columns)
+
+        if shape == 'lob':
+            # Slices of one random block: 2-16 KB of text per row without generating every character.
+            block = ''.join(rng.choice(list('abcdefghijklmnopqrstuvwxyz     '), 65536))
+            offsets, lengths = rng.integers(0, 65536 - 16384, rows), rng.integers(2048, 16384, rows)
+            return pd.DataFrame({
+                'id': ids,
+                'title': 'document_' + pd.Series(ids).astype(str),
+                'body': [block[offset:offset + length] for offset, length in zip(offsets, lengths)],
+            })
+
+        if shape == 'high_cardinality':
+            tokens = pd.Series(rng.integers(0, 2 ** 62, rows, dtype=np.int64)).map('{:016x}'.format)
+            return pd.DataFrame({
+                'id': ids,
+                'token': tokens,
+                'email': 'user' + pd.Series(ids).astype(str) + '@example.com',
+                'account_no': rng.integers(0, 2 ** 40, rows, dtype=np.int64),
+                'score': rng.random(rows),
+            })
+
+        raise ValueError(f"Unknown benchmark shape: {shape}")
+
+    @staticmethod
+    def prepare_source(source, shape: str, rows: int, seed: int, chunk_rows: int = 100000):
+        table_name = f"bench_{shape}_{rows}"
+        if inspect(source).has_table(table_name):
+            with source.connect() as connection:
+                if connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar() == rows:
+                    return table_name
+
+        start_time = time.perf_counter()
+        if_exists = 'replace'
+        for start in range(0, rows, chunk_rows):
+            chunk = EtlBenchmark.generate_chunk(shape, start, min(chunk_rows, rows - start), seed)
+            chunk.to_sql(table_name, source, if_exists=if_exists, index=False)
+            if_exists = 'append'
+        logging.info(f"Generated {rows} {shape} rows into {table_name} in {time.perf_counter() - start_time:.1f}s")
+        return table_name
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- targets
+    @staticmethod
+    def get_targets(bench_dir: str, pg_url: str = None):
+        targets = {'SQLite': (create_engine(f"sqlite:///{os.path.join(bench_dir, 'target.db')}", connect_args={'timeout': 120}), 'main')}
+        if pg_url:
+            try:
+                engine = create_engine(pg_url)
+                with engine.connect() as connection:
+                    connection.execute(text("SELECT 1"))
+                targets['Postgresql'] = (engine, 'public')
+            except Exception as e:
+                logging.warning(f"Skipping PostgreSQL target: {e}")
+        return targets
+
+    @staticmethod
+    def reset_target(target, target_type: str, schema: str, table_name: str, sample):
+        sample.head(0).to_sql(table_name, target, schema=schema if target_type != 'SQLite' else None, if_exists='replace', index=False)
+        if target_type == 'SQLite':
+            return {column['name'].lower(): md.ColumnInfo(column['name'].lower(), str(column['type']).lower(), None, None, None, True, position)
+                    for position, column in enumerate(inspect(target).get_columns(table_name), start=1)}
+        md.db_metadata.invalidate(target, target_type, schema)
+        return etl.db_process.get_column_metadata_from_db(target, table_name, target_type, schema)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- transfer paths
+    @staticmethod
+    def run_path(path: str, source, source_table: str, target, target_type: str, schema: str, table_name: str, destination_columns,
+                 chunksize: int, workers: int, reject_path: str):
+        P = etl.db_process
+        metrics = em.RunMetrics(f"BENCH_{path}_{table_name}_{target_type}")
+        source = metrics.attach(source, 'source')
+        target = metrics.attach(target, 'target')
+        query = f"SELECT * FROM {source_table}"
+        target_schema = schema if target_type != 'SQLite' else None
+        bulk_loader = EtlBenchmark.BULK_LOADERS[target_type]
+
+        if path == 'to_sql':
+            with P.stage_timer(metrics, 'extract'):
+                df = P.extract_data_from_db(query, source)
+            metrics.add_rows('extract', rows_out=len(df), bytes_out=em.RunMetrics.frame_bytes(df))
+            loaded, _ = P.transform_chunk(1, df, destination_columns, target_type, reject_path, 'drop', None, None, metrics)
+            loaded = P.load_chunk(loaded, table_name, target, None, target_schema, 'to_sql', 'append', None, None, metrics)
+        elif path == 'parallel':
+            partition_queries = P.build_partition_queries(query, {'type': 'range', 'column': 'id', 'partitions': workers}, source)
+            loaded = P.run_partitioned_pipeline(partition_queries, source, target, table_name, destination_columns, target_type, target_schema,
+                                                bulk_loader, chunksize, workers, 'append', None, reject_path, 'drop',
+                                                P.create_row_hash_set('exact'), metrics=metrics)
+        else:
+            chunks = P.extract_data_in_chunks(query, source, chunksize)
+            try:
+                if path == 'pipelined':
+                    loaded = P.run_pipelined(chunks, table_name, target, destination_columns, target_type, target_schema, bulk_loader, 'append',
+                                             None, reject_path, 'drop', P.create_row_hash_set('exact'), metrics=metrics)
+                else:
+                    loader = 'to_sql' if path == 'chunked' else bulk_loader
+                    loaded = P.run_chunked_pipeline(chunks, table_name, target, destination_columns, target_type, target_schema, loader, 'append',
+                                                    None, reject_path, 'drop', P.create_row_hash_set('exact'), metrics)
+            finally:
+                chunks.close()
+
+        summary = metrics.finish(loaded)
+        with target.connect() as connection:
+            summary['rows_in_target'] = connection.execute(text(f"SELECT COUNT(*) FROM {table_name}")).scalar()
+        return summary
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- results
+    @staticmethod
+    def environment():
+        try:
+            commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+                                    cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            commit = None
+        return {'commit': commit, 'recorded_at': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                'pandas': pd.__version__, 'sqlalchemy': sqlalchemy.__version__, 'platform': platform.platform(), 'cpus': os.cpu_count()}
+
+    @staticmethod
+    def result_key(result):
+        return (result['shape'], result['rows'], result['target'], result['path'])
+
+    @staticmethod
+    def compare(results, baseline_path: str, threshold: float = 0.10):
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = {EtlBenchmark.result_key(result): result for result in json.load(f)['results']}
+
+        regressions = []
+        for result in results:
+            previous = baseline.get(EtlBenchmark.result_key(result))
+            if not previous or not previous.get('rows_per_sec') or result.get('error'):
+                continue
+            change = result['rows_per_sec'] / previous['rows_per_sec'] - 1
+            stage_changes = {stage: round(values['seconds'] - previous['stages'][stage]['seconds'], 3)
+                             for stage, values in result['stages'].items() if stage in previous.get('stages', {})}
+            flag = 'REGRESSION' if change < -threshold else 'ok'
+            logging.info(f"{'/'.join(map(str, EtlBenchmark.result_key(result))):<50} {previous['rows_per_sec']:>10} -> {result['rows_per_sec']:<10} "
+                         f"({change:+.1%}) {flag} stage delta s {stage_changes}")
+            if flag == 'REGRESSION':
+                regressions.append(EtlBenchmark.result_key(result))
+        return regressions
+
+    @staticmethod
+    def log_results(results):
+        logging.info(f"{'SHAPE':<18} {'ROWS':>9} {'TARGET':<11} {'PATH':<10} {'SECONDS':>8} {'ROWS/S':>9} {'EXTRACT':>8} {'TRANSFORM':>9} {'LOAD':>8} {'RSS MB':>8}")
+        for result in results:
+            if result.get('error'):
+                logging.info(f"{result['shape']:<18} {result['rows']:>9} {result['target']:<11} {result['path']:<10} FAILED: {result['error']}")
+                continue
+            stages = result['stages']
+            transform_seconds = sum(stages.get(stage, {}).get('seconds', 0) for stage in ('type_check', 'transform', 'coerce'))
+            # Without psutil only the process-wide peak is known, which earlier shapes in the same bench run inflate.
+            rss = f"{result['peak_rss_mb']:>8.1f}" if result.get('peak_rss_mb') is not None else f"{'n/a':>8}"
+            logging.info(f"{result['shape']:<18} {result['rows']:>9} {result['target']:<11} {result['path']:<10} {result['elapsed_seconds']:>8.2f} "
+                         f"{result['rows_per_sec']:>9} {stages.get('extract', {}).get('seconds', 0):>8.2f} {transform_seconds:>9.2f} "
+                         f"{stages.get('load', {}).get('seconds', 0):>8.2f} {rss}")
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- driver
+    @staticmethod
+    def run(shapes, sizes, paths, bench_dir: str, pg_url: str = None, seed: int = 42, chunksize: int = 50000, workers: int = 4, repeat: int = 1):
+        os.makedirs(bench_dir, exist_ok=True)
+        source = create_engine(f"sqlite:///{os.path.join(bench_dir, f'source_{seed}.db')}")
+        targets = EtlBenchmark.get_targets(bench_dir, pg_url)
+        results = []
+
+        for shape in shapes:
+            for rows in sizes:
+                source_table = EtlBenchmark.prepare_source(source, shape, rows, seed)
+                sample = EtlBenchmark.generate_chunk(shape, 0, 10, seed)
+                for target_type, (target, schema) in targets.items():
+                    for path in paths:
+                        table_name = f"bench_{shape}"
+                        reject_path = os.path.join(bench_dir, f"{table_name}_rejects.csv")
+                        result = {'shape': shape, 'rows': rows, 'target': target_type, 'path': path}
+                        # Best of `repeat` runs, which filters out most scheduler and cache noise on small sizes.
+                        for attempt in range(repeat):
+                            destination_columns = EtlBenchmark.reset_target(target, target_type, schema, table_name, sample)
+                            try:
+                                summary = EtlBenchmark.run_path(path, source, source_table, target, target_type, schema, table_name,
+                                                                destination_columns, chunksize, workers, reject_path)
+                            except Exception as e:
+                                logging.error(f"Benchmark {shape}/{rows}/{target_type}/{path} failed: {e}")
+                                result['error'] = str(e)
+                                break
+                            if summary['rows_per_sec'] > result.get('rows_per_sec', -1):
+                                result.update(summary, repeat=repeat)
+                        results.append(result)
+        return results
+
+    @staticmethod
+    def main(argv):
+        parser = argparse.ArgumentParser(description="Benchmark source-to-target transfer paths on synthetic data.")
+        parser.add_argument('--shapes', default='etl_process_data', help=f"comma separated, from {EtlBenchmark.SHAPES}")
+        parser.add_argument('--sizes', default='10k', help=f"comma separated, from {list(EtlBenchmark.SIZES)} or row counts")
+        parser.add_argument('--paths', default=','.join(EtlBenchmark.PATHS), help=f"comma separated, from {EtlBenchmark.PATHS}")
+        parser.add_argument('--pg-url', default=os.environ.get('ETL_BENCH_PG_URL'), help="SQLAlchemy URL of a local PostgreSQL target")
+        parser.add_argument('--bench-dir', default='bench_data', help="where the generated source and SQLite target live")
+        parser.add_argument('--output', default=None, help="results JSON (default bench_results/bench_<timestamp>.json)")
+        parser.add_argument('--baseline', default=None, help="earlier results JSON to compare against")
+        parser.add_argument('--threshold', type=float, default=0.10, help="rows/s drop that counts as a regression")
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--chunksize', type=int, default=50000)
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--repeat', type=int, default=1, help="runs per combination; the fastest is kept")
+        parser.add_argument('--verbose', action='store_true', help="keep the per-chunk pipeline logging")
+        args = parser.parse_args(argv)
+
+        shapes = [shape.strip() for shape in args.shapes.split(',')]
+        paths = [path.strip() for path in args.paths.split(',')]
+        sizes = [EtlBenchmark.SIZES.get(size.strip().lower()) or int(size) for size in args.sizes.split(',')]
+        unknown = (set(shapes) - set(EtlBenchmark.SHAPES)) | (set(paths) - set(EtlBenchmark.PATHS))
+        if unknown:
+            logging.error(f"Unknown shapes or paths: {unknown}")
+            return 2
+
+        if not args.verbose:
+            logging.getLogger().setLevel(logging.WARNING)
+        results = EtlBenchmark.run(shapes, sizes, paths, args.bench_dir, args.pg_url, args.seed, args.chunksize, args.workers, args.repeat)
+        logging.getLogger().setLevel(logging.INFO)
+        EtlBenchmark.log_results(results)
+
+        output = args.output or os.path.join('bench_results', f"bench_{datetime.now():%Y%m%d_%H%M%S}.json")
+        os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+        with open(output, 'w', encoding='utf-8') as f:
+            json.dump({'environment': EtlBenchmark.environment(), 'settings': vars(args), 'results': results}, f, indent=2, default=str)
+        logging.info(f"Wrote benchmark results to {output}")
+
+        regressions = EtlBenchmark.compare(results, args.baseline, args.threshold) if args.baseline else []
+        if regressions:
+            logging.error(f"{len(regressions)} regressions beyond {args.threshold:.0%}: {regressions}")
+        failed = [result for result in results if result.get('error')]
+        return 1 if regressions or failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(EtlBenchmark.main(sys.argv[1:]))
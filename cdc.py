@@ -0,0 +1,305 @@
+import json
+import logging
+import sys
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from sqlalchemy import text
+import etlprocess as etl
+import loader_db as ld
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Every source yields events with these columns plus the row image (after-image, or the deleted row for 'D').
+EVENT_COLUMNS = ['change_seq', 'operation', 'change_time']
+
+def normalise_events(df, seq_column: str = 'change_seq', op_column: str = 'operation', time_column: str = 'change_time'):
+    df.columns = df.columns.astype(str).str.lower()
+    df = df.rename(columns={seq_column.lower(): 'change_seq', op_column.lower(): 'operation', time_column.lower(): 'change_time'})
+    df['operation'] = df['operation'].astype(str).str.strip().str[:1].str.upper()
+    df['change_time'] = pd.to_datetime(df['change_time']) if 'change_time' in df.columns else pd.NaT
+    return df
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------- event sources
+class ChangeTableSource:
+
+    mark_type = 'sequence'
+
+    # Trigger-maintained change table: one row per DML with a monotonically increasing sequence, an I/U/D flag and the row image.
+    # Sequences are taken at DML time, not commit time, so a transaction can commit a lower sequence after a higher one was read.
+    # Every read therefore re-reads replay_window sequences below the checkpoint; the net-effect apply makes those replays harmless.
+    def __init__(self, engine, change_table: str, seq_column: str = 'change_seq', op_column: str = 'operation', time_column: str = 'change_time',
+                 replay_window: int = 1000):
+        self.engine = engine
+        self.name = change_table
+        self.seq_column = seq_column
+        self.op_column = op_column
+        self.time_column = time_column
+        self.replay_window = replay_window
+
+    def read_changes(self, after_mark, limit: int):
+        lower = after_mark - self.replay_window if after_mark is not None else None
+        above_mark = f" WHERE {self.seq_column} > :lower" if lower is not None else ""
+        sql = text(f"SELECT * FROM {self.name}{above_mark} ORDER BY {self.seq_column}")
+        with self.engine.connect() as connection:
+            result = connection.execution_options(stream_results=True).execute(sql, {'lower': lower} if lower is not None else {})
+            # The window holds at most replay_window rows, so the batch always spans all of it plus up to limit new events.
+            rows = result.fetchmany(limit + (self.replay_window if lower is not None else 0))
+            df = pd.DataFrame(rows, columns=list(result.keys()))
+        if df.empty:
+            return df, after_mark
+        df = normalise_events(df, self.seq_column, self.op_column, self.time_column)
+        return df, max(int(df['change_seq'].max()), after_mark if after_mark is not None else 0)
+
+    def latest_mark(self):
+        with self.engine.connect() as connection:
+            return connection.execute(text(f"SELECT MAX({self.seq_column}) FROM {self.name}")).scalar()
+
+class FlashbackSource:
+
+    mark_type = 'scn'
+
+    # Oracle flashback versions query; the SCN window is bounded by undo retention, so the poll interval must stay well inside it.
+    def __init__(self, engine, table: str, max_scn_window: int = None):
+        self.engine = engine
+        self.name = table
+        self.max_scn_window = max_scn_window
+
+    def latest_mark(self):
+        with self.engine.connect() as connection:
+            return int(connection.execute(text("SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER FROM dual")).scalar())
+
+    def read_changes(self, after_mark, limit: int):
+        upto = self.latest_mark()
+        if after_mark is None:
+            # No history to replay: the initial copy comes from etl_process, replication starts at the current SCN.
+            logging.info(f"No checkpoint for {self.name}; starting flashback replication at SCN {upto}")
+            return pd.DataFrame(columns=EVENT_COLUMNS), upto
+        if self.max_scn_window:
+            upto = min(upto, after_mark + self.max_scn_window)
+        if upto <= after_mark:
+            return pd.DataFrame(columns=EVENT_COLUMNS), after_mark
+
+        sql = text(f"""
+            SELECT VERSIONS_STARTSCN AS change_seq, VERSIONS_OPERATION AS operation, VERSIONS_STARTTIME AS change_time, t.*
+            FROM {self.name} VERSIONS BETWEEN SCN :after_mark AND :upto t
+            WHERE VERSIONS_STARTSCN > :after_mark AND VERSIONS_OPERATION IS NOT NULL
+            ORDER BY VERSIONS_STARTSCN
+        """)
+        df = pd.read_sql(sql, con=self.engine, params={'after_mark': after_mark, 'upto': upto})
+        # The whole window is read at once, so the checkpoint is the window end even when it held no changes.
+        return normalise_events(df), upto
+
+class FixtureSource:
+
+    # Local stand-in for development and tests: a CSV, JSON-lines or Parquet file (or a DataFrame) of events.
+    def __init__(self, events, name: str = 'fixture', mark_type: str = 'sequence'):
+        if isinstance(events, str):
+            name = events
+            if events.lower().endswith('.parquet'):
+                events = pd.read_parquet(events)
+            elif events.lower().endswith(('.json', '.jsonl')):
+                events = pd.read_json(events, lines=True)
+            else:
+                events = pd.read_csv(events)
+        self.events = normalise_events(events.copy()).sort_values('change_seq', kind='stable')
+        self.name = name
+        self.mark_type = mark_type
+
+    def read_changes(self, after_mark, limit: int):
+        pending = self.events if after_mark is None else self.events[self.events['change_seq'] > after_mark]
+        batch = pending.head(limit).copy()
+        return batch, int(batch['change_seq'].max()) if not batch.empty else after_mark
+
+    def latest_mark(self):
+        return int(self.events['change_seq'].max()) if not self.events.empty else None
+
+#--------------------------------------------------------------------------------------------------------------------------------------------------- replication
+class CdcReplicator:
+
+    def __init__(self, source, target, db_type: str, table_name: str, key_columns: list, schema: str = None, log_engine=None,
+                 process_name: str = None, batch_size: int = 10000, poll_interval: float = 5.0, loader: str = 'auto', reject_path: str = None):
+        if not key_columns:
+            raise ValueError("CDC replication requires key_columns")
+        self.source = source
+        self.target = target
+        self.db_type = db_type
+        self.table_name = table_name
+        self.key_columns = [col.lower() for col in key_columns]
+        self.schema = schema
+        self.log_engine = log_engine
+        self.process_name = process_name or f"CDC_{source.name}_to_{table_name}"
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.loader = loader
+        self.reject_path = reject_path or f"{table_name}_rejects.csv"
+        self.destination_columns = etl.db_process.get_column_metadata_from_db(target, table_name, db_type, schema) if schema else {}
+        self.mark = None
+        self.applied_seqs = set()
+        self.stats = {'batches': 0, 'events': 0, 'inserted': 0, 'updated': 0, 'deleted': 0}
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- checkpoint
+    def load_checkpoint(self):
+        if self.log_engine is not None:
+            self.mark = etl.db_process.get_watermark(self.log_engine, self.process_name, self.source.name, self.table_name)
+        logging.info(f"{self.process_name}: resuming after {self.source.mark_type} {self.mark}")
+        return self.mark
+
+    def save_checkpoint(self, mark):
+        if self.log_engine is not None:
+            etl.db_process.set_watermark(self.log_engine, self.process_name, mark, 'change_seq', self.source.mark_type, self.source.name, self.table_name)
+        self.mark = mark
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- apply
+    def apply_batch(self, events):
+        # Net effect per key: the last event wins, so replaying a batch after a crash before its checkpoint gives the same target state.
+        events = events.sort_values('change_seq', kind='stable')
+        net = events.drop_duplicates(subset=self.key_columns, keep='last')
+        data_columns = [col for col in net.columns if col not in EVENT_COLUMNS]
+        if self.destination_columns:
+            data_columns = [col for col in data_columns if col in self.destination_columns]
+
+        deletes = net.loc[net['operation'] == 'D', self.key_columns]
+        upserts = net.loc[net['operation'] != 'D', data_columns]
+        if not upserts.empty and self.destination_columns:
+            plan = etl.db_process.build_coercion_plan(dict(upserts.dtypes), self.destination_columns, self.db_type)
+            upserts = etl.db_process.coerce_chunk(upserts, plan, self.reject_path)
+
+        counts = {'inserted': 0, 'updated': 0, 'deleted': 0}
+        with self.target.begin() as connection:
+            counts['deleted'] = ld.db_loader.delete_keys(deletes, self.table_name, connection, self.key_columns, self.schema)
+            if not upserts.empty:
+                counts.update(ld.db_loader.merge_on_connection(upserts, self.table_name, connection, self.db_type, self.key_columns,
+                                                               schema=self.schema, loader=self.loader))
+        return counts
+
+    def report_lag(self, events):
+        lag_seconds = 0.0
+        if events is not None and not events.empty and events['change_time'].notna().any():
+            last_change = pd.Timestamp(events['change_time'].max()).to_pydatetime()
+            lag_seconds = max((datetime.now(last_change.tzinfo) - last_change).total_seconds(), 0.0)
+        try:
+            latest = self.source.latest_mark()
+            backlog = latest - self.mark if latest is not None and self.mark is not None else 0
+        except Exception as e:
+            logging.warning(f"{self.process_name}: could not read the source position: {e}")
+            backlog = None
+        return lag_seconds, backlog
+
+    def step(self):
+        batch_start = time.perf_counter()
+        events, new_mark = self.source.read_changes(self.mark, self.batch_size)
+        # Sources with a replay window return already applied events again; the batch is applied only when it holds unseen ones
+        # (new events or late commits below the checkpoint), and then as a whole so the net effect per key stays correct.
+        new_events = int((~events['change_seq'].isin(self.applied_seqs)).sum()) if not events.empty else 0
+        if new_events:
+            counts = self.apply_batch(events)
+            self.stats['batches'] += 1
+            self.stats['events'] += new_events
+            self.applied_seqs.update(events['change_seq'].tolist())
+            for key, value in counts.items():
+                self.stats[key] += value
+        if new_mark is not None and new_mark != self.mark:
+            self.save_checkpoint(new_mark)
+        replay_window = getattr(self.source, 'replay_window', 0)
+        if self.mark is not None:
+            self.applied_seqs = {seq for seq in self.applied_seqs if seq > self.mark - replay_window}
+
+        if new_events:
+            lag_seconds, backlog = self.report_lag(events)
+            logging.info(f"{self.process_name}: applied {new_events} new events ({len(events)} with replays) up to {self.source.mark_type} {self.mark} "
+                         f"in {time.perf_counter() - batch_start:.2f}s (+{counts['inserted']} ~{counts['updated']} -{counts['deleted']}), "
+                         f"lag {lag_seconds:.1f}s, backlog {backlog}")
+        return new_events
+
+    def run(self, max_batches: int = None, stop_event: threading.Event = None, exit_when_idle: bool = False):
+        start_time = datetime.now()
+        stop_event = stop_event or threading.Event()
+        etl.db_process.log_etl_process(self.log_engine, self.process_name, 'STARTED', 'CDC replication started',
+                                       start_time=start_time, from_table=self.source.name, to_table=self.table_name)
+        try:
+            self.load_checkpoint()
+            batches = 0
+            while not stop_event.is_set() and (max_batches is None or batches < max_batches):
+                applied = self.step()
+                batches += 1
+                if applied < self.batch_size:
+                    if exit_when_idle:
+                        break
+                    stop_event.wait(self.poll_interval)
+        except Exception as e:
+            logging.error(f"{self.process_name} failed at {self.source.mark_type} {self.mark}: {e}")
+            etl.db_process.log_etl_process(self.log_engine, self.process_name, 'FAILED', f"CDC replication failed at {self.mark}: {e}",
+                                           start_time=start_time, end_time=datetime.now(), from_table=self.source.name, to_table=self.table_name)
+            raise
+
+        details = (f"CDC replication stopped at {self.source.mark_type} {self.mark}: {self.stats['events']} events, "
+                   f"{self.stats['inserted']} inserted, {self.stats['updated']} updated, {self.stats['deleted']} deleted")
+        logging.info(f"{self.process_name}: {details}")
+        etl.db_process.log_etl_process(self.log_engine, self.process_name, 'COMPLETED', details,
+                                       start_time=start_time, end_time=datetime.now(), from_table=self.source.name, to_table=self.table_name)
+        return self.stats
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- config driven entry point
+    @staticmethod
+    def build_source(spec: dict, engine):
+        source_type = spec.get('type', 'change_table')
+        if source_type == 'change_table':
+            return ChangeTableSource(engine, spec['change_table'], spec.get('seq_column', 'change_seq'), spec.get('op_column', 'operation'),
+                                     spec.get('time_column', 'change_time'), spec.get('replay_window', 1000))
+        if source_type == 'flashback':
+            return FlashbackSource(engine, spec['table'], spec.get('max_scn_window'))
+        if source_type == 'fixture':
+            return FixtureSource(spec['path'])
+        raise ValueError(f"Unsupported CDC source type: {source_type}")
+
+    @staticmethod
+    def main(argv):
+        if not argv:
+            logging.error("Usage: python cdc.py <config.yaml|config.json>")
+            return 2
+        with open(argv[0], 'r', encoding='utf-8') as f:
+            if argv[0].lower().endswith(('.yaml', '.yml')):
+                import yaml
+                config = yaml.safe_load(f)
+            else:
+                config = json.load(f)
+
+        log_engine = etl.db_process.from_get_connection(db_type=config['etl_pr_dml'], ints=1, fm_db=config['etl_pr_dml_db_config'])
+        source_engine = etl.db_process.from_get_connection(db_type=config['from_db'], fm_db=config['from_db_config'])
+        target_engine = etl.db_process.to_get_connection(db_type=config['to_db'], to_db=config['to_db_config'])
+        if source_engine is None or target_engine is None:
+            logging.error("CDC replication could not connect to the source or target")
+            return 1
+
+        stop_event = threading.Event()
+        replicators = [CdcReplicator(CdcReplicator.build_source(table['source'], source_engine), target_engine, config['to_db'], table['table_name'],
+                                     table['key_columns'], table.get('target_schema', config.get('target_schema')), log_engine,
+                                     batch_size=config.get('batch_size', 10000), poll_interval=config.get('poll_interval', 5.0),
+                                     loader=config.get('loader', 'auto'))
+                       for table in config['tables']]
+        failures = []
+
+        def replicate(replicator):
+            try:
+                replicator.run(stop_event=stop_event)
+            except Exception:
+                failures.append(replicator.process_name)
+
+        threads = [threading.Thread(target=replicate, args=(replicator,), name=replicator.process_name, daemon=True) for replicator in replicators]
+        for thread in threads:
+            thread.start()
+        try:
+            while any(thread.is_alive() for thread in threads):
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logging.info("Stopping CDC replication after the current batches")
+            stop_event.set()
+            for thread in threads:
+                thread.join()
+        return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(CdcReplicator.main(sys.argv[1:]))
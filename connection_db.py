@@ -1,23 +1,95 @@
 import cx_Oracle
 import pyodbc
 from sqlalchemy import create_engine
+from sqlalchemy.pool import QueuePool
 from psycopg2 import OperationalError
 import logging
+import threading
+import time
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class TimedQueuePool(QueuePool):
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_time = 0.0
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        finally:
+            self.checkouts += 1
+            self.wait_time += time.perf_counter() - start
+
 class db_connection:
 
+    pool_options = {
+        'pool_size': 5,
+        'max_overflow': 10,
+        'pool_timeout': 30,
+        'pool_recycle': 1800,
+        'pool_pre_ping': True,
+    }
+    _engines = {}
+    _engines_lock = threading.Lock()
+    _oracle_client_initialised = False
+    _oracle_client_lock = threading.Lock()
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- Engine registry
+    @staticmethod
+    def configure_pool(**options):
+        db_connection.pool_options.update(options)
+
+    @staticmethod
+    def _get_engine(key: tuple, url: str):
+        with db_connection._engines_lock:
+            engine = db_connection._engines.get(key)
+            if engine is None:
+                engine = create_engine(url, poolclass=TimedQueuePool, **db_connection.pool_options)
+                db_connection._engines[key] = engine
+                logging.info(f"Created pooled engine for {key[0]} at {key[1]}:{key[2]}")
+            return engine
+
+    @staticmethod
+    def pool_stats():
+        with db_connection._engines_lock:
+            engines = dict(db_connection._engines)
+        stats = {}
+        for key, engine in engines.items():
+            pool = engine.pool
+            stats[key] = {
+                'size': pool.size(),
+                'checked_out': pool.checkedout(),
+                'overflow': pool.overflow(),
+                'checkouts': pool.checkouts,
+                'wait_time': round(pool.wait_time, 3),
+            }
+        return stats
+
+    @staticmethod
+    def dispose_all():
+        with db_connection._engines_lock:
+            for engine in db_connection._engines.values():
+                engine.dispose()
+            db_connection._engines.clear()
+
     #--------------------------------------------------------------------------------------------------------------------------------------------------- Oracle connection
     @staticmethod
     def connect_oracle(ints: int, host: str = 'localhost', port: int = 1521, service_name: str = 'xepdb1', user: str = 'hr', password: str = 'hr1'):
         try:
             if ints == 1:
-                cx_Oracle.init_oracle_client(lib_dir=r"C:\oracle\dbhomeXE\bin")
+                # init_oracle_client raises on a second call, so concurrent JobRunner workers must not both get past the check.
+                with db_connection._oracle_client_lock:
+                    if not db_connection._oracle_client_initialised:
+                        cx_Oracle.init_oracle_client(lib_dir=r"C:\oracle\dbhomeXE\bin")
+                        db_connection._oracle_client_initialised = True
             
             dsn_tns = cx_Oracle.makedsn(host, port, service_name=service_name)
             oracle_url = f"oracle+cx_oracle://{user}:{password}@{dsn_tns}"
-            engine = create_engine(oracle_url)
+            engine = db_connection._get_engine(("Oracle", host, port, service_name, user), oracle_url)
             logging.info(f"Successfully connected to Oracle Database at {host}:{port} via SQLAlchemy")
             return engine
         except cx_Oracle.DatabaseError as e:
@@ -29,7 +101,7 @@ class db_connection:
     def connect_postgresql(host: str = 'localhost', port: int = 5432, db: str = 'postgres', user: str = 'postgres', password: str = 'hr1'):
         try:
             postgres_url = f'postgresql://{user}:{password}@{host}:{port}/{db}'
-            engine = create_engine(postgres_url)
+            engine = db_connection._get_engine(("PostgreSQL", host, port, db, user), postgres_url)
             logging.info(f"Successfully connected to PostgreSQL Database at {host}:{port} via SQLAlchemy")
             return engine
         except OperationalError as e:
@@ -41,7 +113,7 @@ class db_connection:
     def connect_mysql(host: str = 'localhost', port: int = 3306, db: str = 'mysql_db', user: str = 'mysql_user', password: str = 'mysql_password'):
         try:
             mysql_url = f'mysql+pymysql://{user}:{password}@{host}:{port}/{db}'
-            engine = create_engine(mysql_url)
+            engine = db_connection._get_engine(("MySQL", host, port, db, user), mysql_url)
             logging.info(f"Successfully connected to MySQL Database at {host}:{port} via SQLAlchemy")
             return engine
         except Exception as e:
@@ -53,7 +125,7 @@ class db_connection:
     def connect_mariadb(host: str = 'localhost', port: int = 3306, db: str = 'mariadb_db', user: str = 'mariadb_user', password: str = 'mariadb_password'):
         try:
             mariadb_url = f'mysql+pymysql://{user}:{password}@{host}:{port}/{db}'
-            engine = create_engine(mariadb_url)
+            engine = db_connection._get_engine(("MariaDB", host, port, db, user), mariadb_url)
             logging.info(f"Successfully connected to MariaDB Database at {host}:{port} via SQLAlchemy")
             return engine
         except Exception as e:
@@ -65,7 +137,7 @@ class db_connection:
     def connect_mssql(host: str = 'localhost', port: int = 1433, db: str = 'mssql_db', user: str = 'mssql_user', password: str = 'mssql_password', driver: str = '{ODBC Driver 17 for SQL Server}'):
         try:
             mssql_url = f'mssql+pyodbc://{user}:{password}@{host}:{port}/{db}?driver={driver}'
-            engine = create_engine(mssql_url)
+            engine = db_connection._get_engine(("MSSQL", host, port, db, user), mssql_url)
             logging.info(f"Successfully connected to MSSQL Database at {host}:{port} via SQLAlchemy")
             return engine
         except pyodbc.Error as e:
@@ -0,0 +1,226 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import event, text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class RunMetrics:
+
+    STAGES = ['extract', 'type_check', 'transform', 'coerce', 'load']
+
+    METRICS_INSERT_SQL = """
+        INSERT INTO etl_process_metrics (process_name, run_start, stage, seconds, calls, rows_in, rows_out, bytes_in, bytes_out,
+                                         round_trips, peak_rss_mb, recorded_at)
+        VALUES (:process_name, :run_start, :stage, :seconds, :calls, :rows_in, :rows_out, :bytes_in, :bytes_out,
+                :round_trips, :peak_rss_mb, :recorded_at)
+    """
+
+    # Run engine id -> (metrics, role) for paths that use raw DBAPI cursors and so never fire SQLAlchemy cursor events.
+    _raw_counters = {}
+    _raw_counters_lock = threading.Lock()
+
+    def __init__(self, process_name: str):
+        self.process_name = process_name
+        self.run_start = datetime.now()
+        self._started = time.perf_counter()
+        self.elapsed = None
+        self.stages = {}
+        self.round_trips = {}
+        self.peak_rss_mb = 0.0
+        self.rss_per_run = RunMetrics.rss_is_per_run()
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, {'seconds': 0.0, 'calls': 0, 'rows_in': 0, 'rows_out': 0, 'bytes_in': 0, 'bytes_out': 0})
+
+    @staticmethod
+    def frame_bytes(df):
+        # Shallow size: object columns count pointers, not string payloads, so this stays cheap on every chunk.
+        return int(df.memory_usage(index=False).sum()) if df is not None else 0
+
+    @staticmethod
+    def rss_is_per_run():
+        # psutil samples the current RSS during the run; the resource fallback only has ru_maxrss, the peak of the whole process so far,
+        # which later runs in the same process inherit from earlier ones.
+        try:
+            import psutil
+            return True
+        except ImportError:
+            return False
+
+    @staticmethod
+    def current_rss_mb():
+        try:
+            import psutil
+            return psutil.Process().memory_info().rss / 1048576
+        except ImportError:
+            pass
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1048576 if sys.platform == 'darwin' else 1024)
+        except ImportError:
+            return 0.0
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- stage timers
+    @contextmanager
+    def time_stage(self, name):
+        stage_start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - stage_start
+            rss_mb = RunMetrics.current_rss_mb()
+            with self._lock:
+                stage = self._stage(name)
+                stage['seconds'] += seconds
+                stage['calls'] += 1
+                self.peak_rss_mb = max(self.peak_rss_mb, rss_mb)
+
+    def add_rows(self, name, rows_in: int = 0, rows_out: int = 0, bytes_in: int = 0, bytes_out: int = 0):
+        with self._lock:
+            stage = self._stage(name)
+            stage['rows_in'] += rows_in
+            stage['rows_out'] += rows_out
+            stage['bytes_in'] += bytes_in
+            stage['bytes_out'] += bytes_out
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- DB round trips
+    def attach(self, engine, role: str):
+        # Pooled engines are shared by concurrent runs, so the run gets its own engine via execution_options (same pool, run-local
+        # events) and must use the returned engine. Counts every SQLAlchemy cursor execute on it (executemany counts once), plus
+        # the batches and fetches the raw-cursor loaders and the Oracle fetch path report through record_round_trips.
+        if engine is None or not hasattr(engine, 'dispatch'):
+            return engine
+        run_engine = engine.execution_options(etl_run=f"{self.process_name}:{id(self)}:{role}")
+
+        def count_round_trip(conn, cursor, statement, parameters, context, executemany):
+            self.add_round_trips(role)
+
+        event.listen(run_engine, 'before_cursor_execute', count_round_trip)
+        self._listeners.append((run_engine, count_round_trip))
+        with RunMetrics._raw_counters_lock:
+            RunMetrics._raw_counters[id(run_engine)] = (self, role)
+        return run_engine
+
+    def detach(self):
+        for engine, listener in self._listeners:
+            if event.contains(engine, 'before_cursor_execute', listener):
+                event.remove(engine, 'before_cursor_execute', listener)
+            with RunMetrics._raw_counters_lock:
+                RunMetrics._raw_counters.pop(id(engine), None)
+        self._listeners = []
+
+    def add_round_trips(self, role: str, count: int = 1):
+        with self._lock:
+            self.round_trips[role] = self.round_trips.get(role, 0) + count
+
+    @staticmethod
+    def record_round_trips(engine, count: int = 1):
+        # Called from raw DBAPI cursor paths (COPY, array binds, fetchmany, LOB reads) with the engine they borrowed a connection from.
+        if not count:
+            return
+        with RunMetrics._raw_counters_lock:
+            counter = RunMetrics._raw_counters.get(id(engine))
+        if counter:
+            counter[0].add_round_trips(counter[1], count)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- summary / persistence
+    def finish(self, rows_loaded: int = None):
+        self.detach()
+        self.elapsed = time.perf_counter() - self._started
+        self.peak_rss_mb = max(self.peak_rss_mb, RunMetrics.current_rss_mb())
+        rows_loaded = rows_loaded if rows_loaded is not None else self.stages.get('load', {}).get('rows_out', 0)
+        rate = rows_loaded / self.elapsed if self.elapsed > 0 else 0
+
+        rss_label = "peak rss" if self.rss_per_run else "process peak rss (ru_maxrss, install psutil for per-run rss)"
+        logging.info(f"Metrics for {self.process_name}: {rows_loaded} rows in {self.elapsed:.2f}s ({rate:.0f} rows/s), "
+                     f"{rss_label} {self.peak_rss_mb:.1f} MB, round trips {self.round_trips}")
+        for name in self.ordered_stages():
+            stage = self.stages[name]
+            share = 100 * stage['seconds'] / self.elapsed if self.elapsed > 0 else 0
+            logging.info(f"  {name:<10} {stage['seconds']:>8.2f}s ({share:>3.0f}%) calls {stage['calls']:>6} "
+                         f"rows {stage['rows_in']:>10} -> {stage['rows_out']:<10} bytes {stage['bytes_in']:>12} -> {stage['bytes_out']}")
+        return self.summary(rows_loaded)
+
+    def ordered_stages(self):
+        return [name for name in RunMetrics.STAGES if name in self.stages] + sorted(set(self.stages) - set(RunMetrics.STAGES))
+
+    def run_peak_rss_mb(self):
+        # None when only the process-wide peak is known, so it never lands in per-run rows or comparisons.
+        return round(self.peak_rss_mb, 1) if self.rss_per_run else None
+
+    def summary(self, rows_loaded: int = None):
+        elapsed = self.elapsed if self.elapsed is not None else time.perf_counter() - self._started
+        return {'process_name': self.process_name, 'run_start': self.run_start.isoformat(), 'elapsed_seconds': round(elapsed, 3),
+                'rows_loaded': rows_loaded, 'rows_per_sec': round(rows_loaded / elapsed) if rows_loaded and elapsed > 0 else 0,
+                'peak_rss_mb': self.run_peak_rss_mb(), 'process_peak_rss_mb': None if self.rss_per_run else round(self.peak_rss_mb, 1),
+                'round_trips': dict(self.round_trips),
+                'stages': {name: dict(self.stages[name], seconds=round(self.stages[name]['seconds'], 3)) for name in self.ordered_stages()}}
+
+    def persist(self, engine):
+        # One row per stage plus a 'total' row carrying elapsed time, peak RSS and all round trips.
+        if engine is None:
+            return
+        recorded_at = datetime.now()
+        total = {'seconds': self.elapsed or 0.0, 'calls': 1,
+                 'rows_in': self.stages.get('extract', {}).get('rows_out', 0), 'rows_out': self.stages.get('load', {}).get('rows_out', 0),
+                 'bytes_in': self.stages.get('extract', {}).get('bytes_out', 0), 'bytes_out': self.stages.get('load', {}).get('bytes_in', 0)}
+        rows = [dict(self.stages[name], stage=name, round_trips=None, peak_rss_mb=None) for name in self.ordered_stages()]
+        rows.append(dict(total, stage='total', round_trips=sum(self.round_trips.values()), peak_rss_mb=self.run_peak_rss_mb()))
+        for row in rows:
+            row.update(process_name=self.process_name, run_start=self.run_start, recorded_at=recorded_at, seconds=round(row['seconds'], 3))
+        try:
+            with engine.begin() as connection:
+                connection.execute(text(RunMetrics.METRICS_INSERT_SQL), rows)
+        except Exception as e:
+            logging.warning(f"Could not write run metrics to etl_process_metrics: {e}")
+
+    def to_prometheus(self):
+        labels = f'process="{self.process_name}"'
+        lines = ['# HELP etl_stage_seconds Wall time spent in each ETL stage.', '# TYPE etl_stage_seconds gauge']
+        lines += [f'etl_stage_seconds{{{labels},stage="{name}"}} {self.stages[name]["seconds"]:.6f}' for name in self.ordered_stages()]
+        for metric, key in [('etl_stage_rows_in', 'rows_in'), ('etl_stage_rows_out', 'rows_out'), ('etl_stage_bytes_in', 'bytes_in'), ('etl_stage_bytes_out', 'bytes_out')]:
+            lines += [f'# TYPE {metric} gauge']
+            lines += [f'{metric}{{{labels},stage="{name}"}} {self.stages[name][key]}' for name in self.ordered_stages()]
+        lines += ['# TYPE etl_db_round_trips gauge']
+        lines += [f'etl_db_round_trips{{{labels},role="{role}"}} {count}' for role, count in self.round_trips.items()]
+        lines += ['# TYPE etl_run_seconds gauge', f'etl_run_seconds{{{labels}}} {self.elapsed or 0:.6f}']
+        rss_metric = 'etl_peak_rss_megabytes' if self.rss_per_run else 'etl_process_peak_rss_megabytes'
+        lines += [f'# TYPE {rss_metric} gauge', f'{rss_metric}{{{labels}}} {self.peak_rss_mb:.1f}']
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        # Written atomically so a node_exporter textfile collector never reads a half-written file.
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+        os.replace(temp_path, path)
+        logging.info(f"Wrote Prometheus metrics to {path}")
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- profiling
+    @staticmethod
+    def start_profile(profile_path: str = None):
+        if not profile_path:
+            return None
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    @staticmethod
+    def stop_profile(profiler, profile_path: str, top: int = 25):
+        if profiler is None:
+            return
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+        report = io.StringIO()
+        pstats.Stats(profiler, stream=report).sort_stats('cumulative').print_stats(top)
+        logging.info(f"Wrote cProfile stats to {profile_path}; top {top} by cumulative time:\n{report.getvalue()}")
@@ -1,15 +1,167 @@
+import numpy as np
 import pandas as pd
 import os
 import connection_db as c_db
+import loader_db as ld
+import metadata_db as md
+import etl_metrics as em
 import logging
-from sqlalchemy import text, inspect
+from sqlalchemy import text, inspect, bindparam, DateTime
 from datetime import datetime
+import queue
 import re
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing, nullcontext
+import atexit
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+class RowHashSet:
+
+    # Exact dedup across chunks: 8 bytes per distinct row, kept as geometrically sized sorted runs (a small LSM tree),
+    # so each hash is merged O(log n) times and a stable sort of two sorted runs is a linear merge.
+    def __init__(self):
+        self._runs = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return sum(len(run) for run in self._runs)
+
+    def _contains(self, hashes):
+        # Searching with sorted keys keeps searchsorted cache friendly on large runs.
+        order = np.argsort(hashes)
+        keys = hashes[order]
+        found_sorted = np.zeros(len(keys), dtype=bool)
+        for run in self._runs:
+            positions = np.minimum(np.searchsorted(run, keys), len(run) - 1)
+            found_sorted |= run[positions] == keys
+        found = np.empty(len(hashes), dtype=bool)
+        found[order] = found_sorted
+        return found
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        first_in_batch = ~pd.Series(hashes).duplicated().to_numpy()
+        with self._lock:
+            new = first_in_batch & ~self._contains(hashes)
+            if new.any():
+                run = np.sort(hashes[new])
+                while self._runs and len(self._runs[-1]) <= 2 * len(run):
+                    run = np.sort(np.concatenate([self._runs.pop(), run]), kind='stable')
+                self._runs.append(run)
+        return new
+
+class BloomFilter:
+
+    # Approximate: a false positive drops a row that was not actually a duplicate, at the configured error rate.
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        self.size = int(-capacity * np.log(error_rate) / (np.log(2) ** 2)) or 1
+        self.hash_count = max(1, int(round(self.size / capacity * np.log(2))))
+        self._bits = np.zeros((self.size + 7) // 8, dtype=np.uint8)
+        self._lock = threading.Lock()
+
+    def _positions(self, hashes):
+        low = (hashes & np.uint64(0xFFFFFFFF))[:, None]
+        high = (hashes >> np.uint64(32))[:, None]
+        rounds = np.arange(self.hash_count, dtype=np.uint64)[None, :]
+        return (low + rounds * high) % np.uint64(self.size)
+
+    def add(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        first_in_batch = ~pd.Series(hashes).duplicated().to_numpy()
+        positions = self._positions(hashes)
+        byte_index, bit_mask = positions >> np.uint64(3), (np.uint8(1) << (positions & np.uint64(7)).astype(np.uint8))
+        with self._lock:
+            present = ((self._bits[byte_index] & bit_mask) != 0).all(axis=1)
+            new = first_in_batch & ~present
+            np.bitwise_or.at(self._bits, byte_index[new].ravel(), bit_mask[new].ravel())
+        return new
+
+class EtlLogWriter:
+
+    def __init__(self, engine, flush_interval: float = 2.0, batch_size: int = 200, max_queue: int = 100000,
+                 fallback_path: str = 'etl_process_log.sqlite'):
+        self.engine = engine
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.fallback_path = fallback_path
+        self.dropped = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='etl-log-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, event):
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+            logging.warning(f"ETL log queue full; dropped event for {event['process_name']} ({self.dropped} dropped)")
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            batch = []
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                try:
+                    event = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if event is None:
+                    stopping = True
+                    break
+                batch.append(event)
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch):
+        if self.engine is not None:
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(db_process.log_merge_statement(), batch)
+                logging.info(f"ETL log flushed {len(batch)} events")
+                return
+            except Exception as e:
+                logging.error(f"Failed to flush ETL log batch, writing to {self.fallback_path}: {e}")
+        self._write_fallback(batch)
+
+    def _write_fallback(self, batch):
+        try:
+            with closing(sqlite3.connect(self.fallback_path)) as connection, connection:
+                connection.execute("""
+                    CREATE TABLE IF NOT EXISTS etl_process_log (
+                        process_name TEXT, status TEXT, details TEXT, start_time TEXT, end_time TEXT, from_table TEXT, to_table TEXT,
+                        PRIMARY KEY (process_name, from_table, to_table))
+                """)
+                connection.executemany("""
+                    INSERT INTO etl_process_log (process_name, status, details, start_time, end_time, from_table, to_table)
+                    VALUES (:process_name, :status, :details, :start_time, :end_time, :from_table, :to_table)
+                    ON CONFLICT (process_name, from_table, to_table)
+                    DO UPDATE SET status = excluded.status, details = excluded.details, end_time = excluded.end_time
+                """, [{key: value.isoformat(sep=' ') if isinstance(value, datetime) else value for key, value in event.items()} for event in batch])
+            logging.info(f"ETL log wrote {len(batch)} events to {self.fallback_path}")
+        except Exception as e:
+            logging.error(f"Failed to write ETL log fallback {self.fallback_path}: {e}")
+
+    def close(self, timeout: float = 30.0):
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logging.error("ETL log queue still full at shutdown; pending events may be lost")
+        self._thread.join(timeout)
+
 class db_process:
 
+    _partition_slots = threading.BoundedSemaphore(8)
+
     @staticmethod
     def from_get_connection(db_type: str, ints: int = None,fm_db: dict=None):
         try:
@@ -50,10 +202,7 @@ class db_process:
             logging.error(f"Error connecting to {db_type}: {e}")
             return None
         
-    @staticmethod
-    def log_etl_process(engine, process_name, status, details, start_time=None, end_time=None, from_table: str = None, to_table: str = None):
-        try:
-            query = text("""
+    LOG_MERGE_SQL = """
                 MERGE INTO etl_process_log target
                 USING (SELECT :process_name AS process_name, :status AS status, :details AS details, 
                     TO_TIMESTAMP(TO_CHAR(:start_time,'RRRR-MM-DD HH24:MI:SS'), 'RRRR-MM-DD HH24:MI:SS') AS start_time,
@@ -67,18 +216,53 @@ class db_process:
                 WHEN NOT MATCHED THEN
                     INSERT (process_name, status, details, start_time, end_time, from_table, to_table)
                     VALUES (source.process_name, source.status, source.details, source.start_time, source.end_time, source.from_table, source.to_table)
-            """)
+            """
+
+    async_log = True
+    _log_writers = {}
+    _log_writers_lock = threading.Lock()
+
+    @staticmethod
+    def log_merge_statement():
+        # Typed timestamps so batched executemany binds stay DATE even when the first event has no end_time.
+        return text(db_process.LOG_MERGE_SQL).bindparams(bindparam('start_time', type_=DateTime), bindparam('end_time', type_=DateTime))
+
+    @staticmethod
+    def get_log_writer(engine):
+        with db_process._log_writers_lock:
+            writer = db_process._log_writers.get(id(engine))
+            if writer is None:
+                writer = EtlLogWriter(engine)
+                db_process._log_writers[id(engine)] = writer
+            return writer
+
+    @staticmethod
+    def close_log_writers():
+        with db_process._log_writers_lock:
+            writers = list(db_process._log_writers.values())
+            db_process._log_writers.clear()
+        for writer in writers:
+            writer.close()
+
+    @staticmethod
+    def log_etl_process(engine, process_name, status, details, start_time=None, end_time=None, from_table: str = None, to_table: str = None):
+        event = {
+            'process_name': process_name,
+            'status': status,
+            'details': details,
+            'start_time': start_time,
+            'end_time': end_time,
+            'from_table': from_table,
+            'to_table': to_table
+        }
+
+        if db_process.async_log:
+            db_process.get_log_writer(engine).submit(event)
+            return
 
+        try:
             with engine.connect() as connection:
-                result = connection.execute(query, {
-                    'process_name': process_name,
-                    'status': status,
-                    'details': details,
-                    'start_time': start_time,
-                    'end_time': end_time,
-                    'from_table': from_table,
-                    'to_table': to_table
-                })
+                result = connection.execute(db_process.log_merge_statement(), event)
                 connection.commit()
                 logging.info(f"Rows affected: {result.rowcount}")
 
@@ -88,84 +272,258 @@ class db_process:
             logging.error(f"Failed to log ETL process: {e}")
 
     @staticmethod
-    def get_columns_and_types_from_db(db_connection, table_name, db_type, schema_name=None):
+    def get_watermark(engine, process_name, from_table: str = None, to_table: str = None):
+        query = text("""
+            SELECT watermark_value, watermark_type FROM etl_process_watermark
+            WHERE process_name = :process_name AND from_table = :from_table AND to_table = :to_table
+        """)
+        with engine.connect() as connection:
+            row = connection.execute(query, {'process_name': process_name, 'from_table': from_table, 'to_table': to_table}).first()
+
+        if row is None or row[0] is None:
+            return None
+        value, watermark_type = row[0], row[1]
+        if watermark_type == 'timestamp':
+            return datetime.fromisoformat(value)
+        if watermark_type == 'scn':
+            return int(value)
+        return int(value) if re.fullmatch(r"-?\d+", value) else float(value)
+
+    @staticmethod
+    def set_watermark(engine, process_name, watermark_value, watermark_column: str = None, watermark_type: str = 'timestamp',
+                      from_table: str = None, to_table: str = None):
+        query = text("""
+            MERGE INTO etl_process_watermark target
+            USING (SELECT :process_name AS process_name, :from_table AS from_table, :to_table AS to_table,
+                :watermark_column AS watermark_column, :watermark_type AS watermark_type, :watermark_value AS watermark_value FROM dual) source
+            ON (target.process_name = source.process_name AND target.from_table = source.from_table
+                AND target.to_table = source.to_table
+                )
+            WHEN MATCHED THEN
+                UPDATE SET watermark_column = source.watermark_column, watermark_type = source.watermark_type,
+                    watermark_value = source.watermark_value, updated_at = SYSTIMESTAMP
+            WHEN NOT MATCHED THEN
+                INSERT (process_name, from_table, to_table, watermark_column, watermark_type, watermark_value, updated_at)
+                VALUES (source.process_name, source.from_table, source.to_table, source.watermark_column, source.watermark_type, source.watermark_value, SYSTIMESTAMP)
+        """)
+        stored_value = watermark_value.isoformat() if isinstance(watermark_value, datetime) else str(watermark_value)
+
+        with engine.begin() as connection:
+            connection.execute(query, {
+                'process_name': process_name,
+                'from_table': from_table,
+                'to_table': to_table,
+                'watermark_column': watermark_column,
+                'watermark_type': watermark_type,
+                'watermark_value': stored_value
+            })
+        logging.info(f"Watermark for {process_name} advanced to {stored_value}")
+
+    @staticmethod
+    def build_incremental_query(query, incremental: dict, last_mark, db_connection):
+        watermark_type = incremental.get('type', 'timestamp')
+
+        if watermark_type == 'scn':
+            high_mark = int(pd.read_sql("SELECT DBMS_FLASHBACK.GET_SYSTEM_CHANGE_NUMBER AS scn FROM dual", con=db_connection).iloc[0, 0])
+            params = {'high_mark': high_mark, 'last_mark': last_mark} if last_mark is not None else {'high_mark': high_mark}
+            return db_process.bound_incremental_query(query, incremental, last_mark), params, high_mark
+
+        column = incremental['column']
+        above_mark = f" WHERE src.{column} > :last_mark" if last_mark is not None else ""
+        params = {'last_mark': last_mark} if last_mark is not None else {}
+        high_mark = pd.read_sql(text(f"SELECT MAX(src.{column}) AS high_mark FROM ({query}) src{above_mark}"), con=db_connection, params=params).iloc[0, 0]
+        if pd.isna(high_mark):
+            return None
+
+        high_mark = high_mark.to_pydatetime() if isinstance(high_mark, pd.Timestamp) else high_mark.item() if hasattr(high_mark, 'item') else high_mark
+        params['high_mark'] = high_mark
+        return db_process.bound_incremental_query(query, incremental, last_mark), params, high_mark
+
+    @staticmethod
+    def bound_incremental_query(query, incremental: dict, last_mark=None):
+        # Rows up to :high_mark, and above :last_mark when given; validation uses the same bound without the lower mark.
+        if incremental.get('type', 'timestamp') == 'scn':
+            return db_process.restrict_base_table(query, "ORA_ROWSCN <= :high_mark" + (" AND ORA_ROWSCN > :last_mark" if last_mark is not None else ""))
+        column = incremental['column']
+        return f"SELECT * FROM ({query}) src WHERE src.{column} <= :high_mark" + (f" AND src.{column} > :last_mark" if last_mark is not None else "")
+
+    @staticmethod
+    def get_column_metadata_from_db(db_connection, table_name, db_type, schema_name=None):
         try:
             if not schema_name:
                 logging.error(f"Schema name is required for {db_type}.")
                 return {}
 
-            if db_type == "Oracle":
-                query = f"""
-                    SELECT lower(COLUMN_NAME) AS COLUMN_NAME, lower(DATA_TYPE) AS DATA_TYPE
-                    FROM ALL_TAB_COLUMNS 
-                    WHERE upper(TABLE_NAME) = '{table_name.upper()}'
-                    AND upper(OWNER) = '{schema_name.upper()}'
-                """
+            return md.db_metadata.get_table_columns(db_connection, table_name, db_type, schema_name)
+
+        except Exception as e:
+            logging.error(f"Error fetching columns and types for {db_type} (Schema: {schema_name}): {e}")
+            return {}
 
-            elif db_type in ["MySql", "MariaDB", "Postgresql", "MSSQL"]:
-                query = f"""
-                    SELECT lower(COLUMN_NAME) AS COLUMN_NAME, lower(DATA_TYPE) AS DATA_TYPE
-                    FROM information_schema.COLUMNS 
-                    WHERE lower(TABLE_SCHEMA) = '{schema_name.lower()}' 
-                    AND lower(TABLE_NAME) = '{table_name.lower()}'
-                """
+    @staticmethod
+    def get_columns_and_types_from_db(db_connection, table_name, db_type, schema_name=None):
+        column_metadata = db_process.get_column_metadata_from_db(db_connection, table_name, db_type, schema_name)
+        return {column_name: column.data_type for column_name, column in column_metadata.items()}
 
-            columns_df = pd.read_sql(query, con=db_connection)
+    TYPE_FAMILIES = {
+        'integer': ["int", "integer", "bigint", "smallint", "tinyint", "mediumint", "serial", "bigserial", "smallserial", "pls_integer", "binary_integer"],
+        'decimal': ["number", "numeric", "decimal", "money", "smallmoney"],
+        'float': ["float", "double", "double precision", "real", "binary_float", "binary_double"],
+        'string': ["varchar2", "nvarchar2", "varchar", "nvarchar", "char", "nchar", "character", "character varying", "text", "ntext",
+                   "tinytext", "mediumtext", "longtext", "clob", "nclob", "long", "uuid", "uniqueidentifier", "json", "jsonb", "xml", "enum", "set"],
+        'datetime': ["date", "timestamp", "datetime", "datetime2", "smalldatetime", "datetimeoffset", "time", "year",
+                     "timestamp without time zone", "timestamp with time zone", "timestamp with local time zone"],
+        'boolean': ["boolean", "bool"],
+        'binary': ["blob", "raw", "long raw", "bytea", "binary", "varbinary", "tinyblob", "mediumblob", "longblob", "image", "bfile"],
+    }
 
-            columns_df.columns = columns_df.columns.str.upper()
+    DIALECT_TYPE_FAMILIES = {
+        "MSSQL": {"bit": 'boolean', "time": 'string'},
+        "MySql": {"bit": 'integer', "year": 'integer'},
+        "MariaDB": {"bit": 'integer', "year": 'integer'},
+        "Postgresql": {"time without time zone": 'string', "time with time zone": 'string'},
+    }
 
-            columns_dict = {row['COLUMN_NAME']: row['DATA_TYPE'] for _, row in columns_df.iterrows()}
+    # source dtype kind -> target family -> 'ok' (no conversion), 'coerce' (vectorised conversion with reject mask) or None (incompatible)
+    COMPATIBILITY = {
+        'integer':   {'integer': 'ok', 'decimal': 'coerce', 'float': 'ok', 'string': 'coerce', 'boolean': 'coerce', 'datetime': None, 'binary': None},
+        'float':     {'integer': 'coerce', 'decimal': 'coerce', 'float': 'ok', 'string': 'coerce', 'boolean': 'coerce', 'datetime': None, 'binary': None},
+        'boolean':   {'integer': 'coerce', 'decimal': 'coerce', 'float': 'coerce', 'string': 'coerce', 'boolean': 'ok', 'datetime': None, 'binary': None},
+        'datetime':  {'integer': None, 'decimal': None, 'float': None, 'string': 'coerce', 'boolean': None, 'datetime': 'ok', 'binary': None},
+        'timedelta': {'integer': None, 'decimal': None, 'float': None, 'string': 'coerce', 'boolean': None, 'datetime': None, 'binary': None},
+        'object':    {'integer': 'coerce', 'decimal': 'coerce', 'float': 'coerce', 'string': 'coerce', 'boolean': 'coerce', 'datetime': 'coerce', 'binary': 'ok'},
+    }
 
-            return columns_dict
+    _reject_lock = threading.Lock()
 
-        except Exception as e:
-            logging.error(f"Error fetching columns and types for {db_type} (Schema: {schema_name}): {e}")
-            return {}
+    @staticmethod
+    def get_type_family(data_type: str, db_type: str = None, scale=None):
+        base_type = re.sub(r"\(.*?\)", "", str(data_type).lower()).strip()
+        family = db_process.DIALECT_TYPE_FAMILIES.get(db_type, {}).get(base_type)
+        if family is None:
+            family = next((name for name, types in db_process.TYPE_FAMILIES.items() if base_type in types), None)
+        if family == 'decimal' and db_type == "Oracle" and scale == 0:
+            return 'integer'
+        return family
+
+    @staticmethod
+    def get_dtype_kind(dtype):
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'boolean'
+        if pd.api.types.is_integer_dtype(dtype):
+            return 'integer'
+        if pd.api.types.is_float_dtype(dtype):
+            return 'float'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'datetime'
+        if pd.api.types.is_timedelta64_dtype(dtype):
+            return 'timedelta'
+        return 'object'
 
     @staticmethod
-    def check_data_type_mismatch(source_df, destination_column_types):
+    def build_coercion_plan(source_dtypes: dict, column_metadata: dict, db_type: str = None):
+        plan = {}
+        for column, dtype in source_dtypes.items():
+            meta = column_metadata.get(str(column).lower())
+            if meta is None:
+                continue
+            if not isinstance(meta, md.ColumnInfo):
+                meta = md.ColumnInfo(str(column).lower(), meta, None, None, None, True, None)
+            family = db_process.get_type_family(meta.data_type, db_type, meta.scale)
+            kind = db_process.get_dtype_kind(dtype)
+            action = db_process.COMPATIBILITY[kind].get(family, 'ok') if family else 'ok'
+            plan[column] = {'kind': kind, 'family': family, 'action': action, 'data_type': meta.data_type,
+                            'length': meta.length, 'precision': meta.precision, 'scale': meta.scale}
+        return plan
+
+    @staticmethod
+    def check_data_type_mismatch(source_df, destination_column_types, db_type: str = None):
         mismatch_found = False
-        type_mappings = {
-                            "datetime": ["DATE", "TIMESTAMP", "DATETIME", "TIME", "YEAR", "DATETIME2", "SMALLDATETIME"],
-                            "int": ["INT", "INTEGER", "NUMBER", "BIGINT", "TINYINT", "SMALLINT", "MEDIUMINT", "SERIAL", "BIGSERIAL"],
-                            "float": ["FLOAT", "DECIMAL", "NUMERIC", "DOUBLE", "REAL", "MONEY", "SMALLMONEY"],
-                            "object": ["VARCHAR2", "VARCHAR", "CHAR", "TEXT", "CLOB", "NVARCHAR", "LONGTEXT", "NCHAR"],
-                            "bytes": ["RAW", "BLOB", "CLOB", "VARBINARY", "BINARY", "LONGBLOB", "IMAGE", "TEXT"],
-                            "boolean": ["BOOLEAN", "BOOL", "BIT", "TINYINT(1)", "CHAR(1)"],
-                            "date": ["DATE", "DATETIME", "TIMESTAMP", "DATEONLY", "DATE", "TIME", "YEAR", "DATETIME2"],
-                            "json": ["JSON", "JSONB", "TEXT", "LONGTEXT", "XML"],
-                            "uuid": ["UUID", "GUID", "CHAR(36)", "VARCHAR(36)", "UNIQUEIDENTIFIER"],
-                            "enum": ["ENUM", "SET"],
-                            "spatial": ["POINT", "LINESTRING", "POLYGON", "GEOMETRY", "GEOGRAPHY", "GEOMETRYCOLLECTION", "MULTIPOINT", "MULTILINESTRING", "MULTIPOLYGON"],
-                            "interval": ["INTERVAL", "TIME", "TIMEZONE", "DATE", "DATETIME"],
-                            "currency": ["MONEY", "SMALLMONEY", "DECIMAL(19,4)"]
-                        }
-        
-        for column in source_df.columns:
-            source_dtype = source_df[column].dtype
-            dest_dtype = destination_column_types.get(column.upper())
-            if dest_dtype:
-                source_dtype_str = str(source_dtype).lower()
-                dest_dtype_upper = dest_dtype.upper()
-                type_matched = False
-                for source_type, valid_dest_types in type_mappings.items():
-                    if source_type in source_dtype_str:
-                        if any(valid_dest_type in dest_dtype_upper for valid_dest_type in valid_dest_types):
-                            type_matched = True
-                        break
+        plan = db_process.build_coercion_plan(dict(source_df.dtypes), destination_column_types, db_type)
 
-                if not type_matched:
-                    logging.error(
-                        f"Data type mismatch for column '{column}': Source type '{source_dtype}' does not match DB type '{dest_dtype}'"
-                    )
-                    mismatch_found = True
+        for column, entry in plan.items():
+            if entry['action'] is None:
+                logging.error(
+                    f"Data type mismatch for column '{column}': Source type '{source_df[column].dtype}' does not match DB type '{entry['data_type']}'"
+                )
+                mismatch_found = True
 
         return mismatch_found
 
     @staticmethod
-    def extract_data_from_db(query, db_connection):
+    def coerce_chunk(df, plan: dict, reject_path: str = None):
+        rejected = np.zeros(len(df), dtype=bool)
+        reasons = np.full(len(df), None, dtype=object)
+        converted_columns = {}
+
+        for column, entry in plan.items():
+            if column not in df.columns:
+                continue
+            series = df[column]
+            kind, family = db_process.get_dtype_kind(series.dtype), entry['family']
+            action = db_process.COMPATIBILITY[kind].get(family, 'ok') if family else 'ok'
+            notnull = series.notna().to_numpy()
+            bad = np.zeros(len(df), dtype=bool)
+            converted = series
+
+            if action is None:
+                bad |= notnull
+
+            elif family in ('integer', 'decimal', 'float'):
+                if action == 'coerce':
+                    converted = pd.to_numeric(series.astype(object) if kind == 'boolean' else series, errors='coerce')
+                    bad |= notnull & converted.isna().to_numpy()
+                if family == 'integer':
+                    bad |= notnull & ~bad & (converted.fillna(0) % 1 != 0).to_numpy()
+                precision, scale = entry['precision'], entry['scale'] or 0
+                # Integer precisions in information_schema are binary/display widths; only NUMBER/NUMERIC/DECIMAL precisions bound values.
+                if precision and db_process.get_type_family(entry['data_type']) == 'decimal':
+                    bad |= notnull & (converted.abs() >= 10 ** (int(precision) - int(scale))).fillna(False).to_numpy()
+                if family == 'decimal' and entry['scale'] is not None:
+                    converted = converted.round(int(scale))
+                if family == 'integer':
+                    converted = converted.where(~bad, 0)
+                    converted = converted.astype('Int64') if converted.isna().any() else pd.to_numeric(converted, downcast='integer')
+
+            elif family == 'datetime' and action == 'coerce':
+                converted = pd.to_datetime(series, errors='coerce')
+                bad |= notnull & converted.isna().to_numpy()
+
+            elif family == 'string':
+                if action == 'coerce' and kind != 'object':
+                    converted = series.astype(str).where(notnull, None)
+                if entry['length']:
+                    lengths = converted.astype(str).str.len().to_numpy()
+                    bad |= notnull & (lengths > int(entry['length']))
+
+            elif family == 'boolean' and action == 'coerce':
+                bad |= notnull & ~series.isin([0, 1, True, False]).to_numpy()
+
+            if bad.any():
+                reasons[bad & pd.isna(reasons)] = f"{column}: value not valid for {entry['data_type']}"
+                rejected |= bad
+            if converted is not series:
+                converted_columns[column] = converted
+
+        if rejected.any():
+            rejects = df[rejected].assign(reject_reason=reasons[rejected])
+            logging.warning(f"Rejected {len(rejects)} of {len(df)} rows during type coercion")
+            if reject_path:
+                with db_process._reject_lock:
+                    rejects.to_csv(reject_path, mode='a', index=False, header=not os.path.exists(reject_path))
+
+        if converted_columns:
+            df = df.assign(**converted_columns)
+        return df[~rejected] if rejected.any() else df
+
+    @staticmethod
+    def extract_data_from_db(query, db_connection, params: dict = None, fetch_plan: dict = None):
         try:
-            df = pd.read_sql(query, con=db_connection)
+            if fetch_plan:
+                chunks = list(db_process.fetch_oracle_chunks(query, db_connection, 50000, params, fetch_plan))
+                df = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            else:
+                df = pd.read_sql(text(query) if params else query, con=db_connection, params=params)
             if df.empty:
                 logging.warning(f"No data returned for query: {query}")
             else:
@@ -177,18 +535,364 @@ class db_process:
             return None
 
     @staticmethod
-    def transform_data(df, source_columns, destination_columns, handle_null='drop'):
+    def extract_data_in_chunks(query, db_connection, chunksize: int = 50000, params: dict = None, fetch_plan: dict = None):
+        try:
+            if fetch_plan:
+                yield from db_process.fetch_oracle_chunks(query, db_connection, chunksize, params, fetch_plan)
+                return
+            with db_connection.connect().execution_options(stream_results=True, max_row_buffer=chunksize) as connection:
+                chunk_start = time.perf_counter()
+                sql = text(query) if params else query
+                for chunk_no, chunk in enumerate(pd.read_sql(sql, con=connection, params=params, chunksize=chunksize), start=1):
+                    logging.info(f"Chunk {chunk_no}: extracted {len(chunk)} rows in {time.perf_counter() - chunk_start:.2f}s")
+                    yield chunk
+                    chunk_start = time.perf_counter()
+        except Exception as e:
+            logging.error(f"Error extracting data in chunks from DB: {e}")
+            raise
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- Oracle LOB-aware fetch
+    # Approximate bytes per row for non-LOB Oracle types, used to size arraysize from the cached column metadata.
+    ORACLE_TYPE_WIDTHS = {'number': 22, 'float': 22, 'binary_float': 4, 'binary_double': 8, 'date': 7, 'timestamp': 11, 'rowid': 18}
+    ORACLE_LOB_TYPES = ['clob', 'nclob', 'blob']
+
+    @staticmethod
+    def plan_oracle_fetch(query, db_connection, params: dict = None, lob_inline_limit: int = 1048576, fetch_buffer_bytes: int = 16777216,
+                          lob_sample_rows: int = 1000):
+        match = re.search(r"from\s+([\w$#.]+)", query, re.IGNORECASE)
+        if not match:
+            return None
+        owner, _, table = match.group(1).rpartition('.')
+        try:
+            columns = md.db_metadata.get_table_columns(db_connection, table.lower(), "Oracle", owner or db_connection.url.username)
+            selected = [column.lower() for column in db_process.probe_query_columns(query, db_connection, params)]
+        except Exception as e:
+            logging.warning(f"Oracle fetch tuning disabled, could not read metadata for {match.group(1)}: {e}")
+            return None
+        if not columns:
+            return None
+
+        lob_columns = [name for name in selected if name in columns and re.sub(r"\(.*?\)", "", columns[name].data_type) in db_process.ORACLE_LOB_TYPES]
+        lob_lengths = {}
+        if lob_columns:
+            # LOB sizes are sampled from the first rows only, so planning never scans the whole source; this only sizes the fetch,
+            # a larger LOB in an inline column is still fetched in full.
+            lengths_sql = (f"SELECT {', '.join(f'MAX(DBMS_LOB.GETLENGTH(src.{name})) AS {name}' for name in lob_columns)} "
+                           f"FROM (SELECT * FROM ({query}) WHERE ROWNUM <= :lob_sample_rows) src")
+            with db_connection.connect() as connection:
+                row = connection.execute(text(lengths_sql), {**(params or {}), 'lob_sample_rows': lob_sample_rows}).first()
+            lob_lengths = {name: int(value or 0) for name, value in zip(lob_columns, row)}
+
+        inline_lobs = {name for name, length in lob_lengths.items() if length <= lob_inline_limit}
+        locator_lobs = set(lob_lengths) - inline_lobs
+        row_width = 0
+        for name in selected:
+            column = columns.get(name)
+            base_type = re.sub(r"\(.*?\)", "", column.data_type) if column else None
+            if name in inline_lobs:
+                row_width += lob_lengths[name]
+            elif name in locator_lobs:
+                row_width += 100
+            else:
+                row_width += (column.length if column and column.length else db_process.ORACLE_TYPE_WIDTHS.get(base_type, 32))
+
+        arraysize = int(max(10, min(50000, fetch_buffer_bytes // max(row_width, 1))))
+        plan = {'arraysize': arraysize, 'inline_lobs': inline_lobs, 'locator_lobs': locator_lobs}
+        logging.info(f"Oracle fetch plan for {match.group(1)}: ~{row_width} bytes/row, arraysize {arraysize}, "
+                     f"inline LOBs {sorted(inline_lobs)}, locator LOBs {sorted(locator_lobs)} (sampled max lengths {lob_lengths})")
+        return plan
+
+    @staticmethod
+    def fetch_oracle_chunks(query, db_connection, chunksize: int, params: dict, fetch_plan: dict):
+        import cx_Oracle
+        inline_types = {cx_Oracle.DB_TYPE_CLOB: cx_Oracle.DB_TYPE_LONG, cx_Oracle.DB_TYPE_NCLOB: getattr(cx_Oracle, 'DB_TYPE_LONG_NVARCHAR', cx_Oracle.DB_TYPE_LONG),
+                        cx_Oracle.DB_TYPE_BLOB: cx_Oracle.DB_TYPE_LONG_RAW}
+
+        with db_connection.connect() as connection:
+            base_handler = getattr(connection.connection, 'outputtypehandler', None)
+
+            def output_type_handler(cursor, name, default_type, size, precision, scale):
+                # LOBs under the inline limit come back as str/bytes in the fetch array instead of one locator round trip per value.
+                if default_type in inline_types and name.lower() in fetch_plan['inline_lobs']:
+                    return cursor.var(inline_types[default_type], arraysize=cursor.arraysize)
+                if base_handler:
+                    return base_handler(cursor, name, default_type, size, precision, scale)
+
+            cursor = connection.connection.cursor()
+            try:
+                cursor.arraysize = fetch_plan['arraysize']
+                if hasattr(cursor, 'prefetchrows'):
+                    cursor.prefetchrows = fetch_plan['arraysize']
+                cursor.outputtypehandler = output_type_handler
+                chunk_start = time.perf_counter()
+                cursor.execute(query, params or {})
+                em.RunMetrics.record_round_trips(db_connection)
+                columns = [description[0].lower() for description in cursor.description]
+                # Columns whose sampled LOBs exceed the inline limit keep small locator buffers; each value is read in one call and
+                # materialised in the chunk, because the loaders take DataFrames.
+                locators = [i for i, name in enumerate(columns) if name in fetch_plan['locator_lobs']]
+                chunk_no = 0
+                while True:
+                    rows = cursor.fetchmany(chunksize)
+                    # The raw cursor bypasses SQLAlchemy events: fetchmany costs one round trip per arraysize rows, each locator read one more.
+                    round_trips = max(1, -(-len(rows) // cursor.arraysize))
+                    if not rows:
+                        em.RunMetrics.record_round_trips(db_connection, round_trips)
+                        break
+                    if locators:
+                        rows = [list(row) for row in rows]
+                        for row in rows:
+                            for i in locators:
+                                if row[i] is not None:
+                                    row[i] = row[i].read()
+                                    round_trips += 1
+                    em.RunMetrics.record_round_trips(db_connection, round_trips)
+                    chunk_no += 1
+                    chunk = pd.DataFrame.from_records(rows, columns=columns)
+                    logging.info(f"Chunk {chunk_no}: extracted {len(chunk)} rows in {time.perf_counter() - chunk_start:.2f}s (arraysize {cursor.arraysize})")
+                    yield chunk
+                    chunk_start = time.perf_counter()
+            finally:
+                cursor.close()
+
+    # Words that can follow a table in FROM without being its alias.
+    TABLE_ALIAS_STOPWORDS = ["where", "join", "inner", "left", "right", "full", "cross", "natural", "outer", "on", "using", "group", "order",
+                             "having", "connect", "start", "union", "minus", "intersect", "except", "fetch", "offset", "sample", "as",
+                             "partition", "pivot", "unpivot", "model", "for", "window", "limit"]
+
+    @staticmethod
+    def restrict_base_table(query, predicate):
+        # Filters the first table in FROM through an inline view over that table instead of splicing the predicate into the
+        # user's WHERE, so subqueries, ORDER BY / FETCH tails and wrapped queries keep their scope, and pseudo-columns such as
+        # ROWID and ORA_ROWSCN stay valid because the view reads the table directly. A second restriction joins the marked view.
+        restricted = re.search(r"\bfrom\s+\(SELECT /\* etl_restrict \*/ \* FROM [\w$#.]+ WHERE ", query, re.IGNORECASE)
+        if restricted:
+            return f"{query[:restricted.end()]}({predicate}) AND {query[restricted.end():]}"
+
+        stopwords = "|".join(db_process.TABLE_ALIAS_STOPWORDS)
+        match = re.search(rf"\bfrom\s+([\w$#.]+)(?:\s+(?!(?:{stopwords})\b)([A-Za-z_][\w$#]*))?", query, re.IGNORECASE)
+        if not match:
+            raise ValueError(f"Cannot determine the base table to restrict in: {query}")
+        table, alias = match.group(1), match.group(2) or match.group(1).split('.')[-1]
+        return f"{query[:match.start(1)]}(SELECT /* etl_restrict */ * FROM {table} WHERE ({predicate})) {alias}{query[match.end():]}"
+
+    # Dialects whose default DISTINCT compares strings exactly like hash_rows; MySQL/MSSQL collations are usually case-insensitive.
+    PUSHDOWN_DISTINCT_DIALECTS = ["Oracle", "Postgresql"]
+
+    @staticmethod
+    def probe_query_columns(query, db_connection, params: dict = None):
+        with db_connection.connect() as connection:
+            return list(connection.execute(text(f"SELECT * FROM ({query}) src WHERE 1 = 0"), params or {}).keys())
+
+    @staticmethod
+    def plan_pushdown(query, destination_columns, db_connection, db_type: str, handle_null: str = 'drop', params: dict = None, distinct: bool = True):
+        # Only removes columns and rows transform_data would drop anyway, so the Python path stays as the safety net.
+        if not query or not re.match(r"\s*select\b", query, re.IGNORECASE):
+            return None
+        try:
+            source_columns = db_process.probe_query_columns(query, db_connection, params)
+        except Exception as e:
+            logging.warning(f"Pushdown disabled, could not probe source columns: {e}")
+            return None
+
+        by_name = {column.lower(): column for column in source_columns}
+        kept = [by_name[column] for column in destination_columns if column in by_name]
+        unsafe = [column for column in kept if not re.match(r"^[A-Za-z_][A-Za-z0-9_$#]*$", column) or (db_type == "Postgresql" and column != column.lower())]
+        if len(by_name) != len(source_columns) or not kept or unsafe:
+            logging.info(f"Pushdown disabled: duplicate, quoted or unmatched source columns {unsafe}")
+            return None
+
+        plan = {'kept_columns': kept, 'dropped_columns': [column for column in source_columns if column.lower() not in destination_columns],
+                'distinct': distinct and db_type in db_process.PUSHDOWN_DISTINCT_DIALECTS, 'not_null': handle_null == 'drop'}
+        if not plan['dropped_columns'] and not plan['distinct'] and not plan['not_null']:
+            return None
+
+        for distinct in ([True, False] if plan['distinct'] else [False]):
+            plan['distinct'] = distinct
+            try:
+                db_process.probe_query_columns(db_process.apply_pushdown(query, plan), db_connection, params)
+                break
+            except Exception as e:
+                # e.g. ORA-00932 for DISTINCT over CLOB/BLOB columns
+                logging.warning(f"Pushdown {'with' if distinct else 'without'} DISTINCT rejected by the source: {e}")
+        else:
+            return None
+
+        logging.info(f"Pushdown: selecting {len(kept)} of {len(source_columns)} columns (dropped {plan['dropped_columns']}), "
+                     f"DISTINCT {'on' if plan['distinct'] else 'off'}, IS NOT NULL {'on' if plan['not_null'] else 'off'}")
+        return plan
+
+    @staticmethod
+    def apply_pushdown(query, plan: dict = None):
+        if not plan:
+            return query
+        select_list = ", ".join(f"src.{column}" for column in plan['kept_columns'])
+        sql = f"SELECT {'DISTINCT ' if plan['distinct'] else ''}{select_list} FROM ({query}) src"
+        if plan['not_null']:
+            sql += " WHERE " + " AND ".join(f"src.{column} IS NOT NULL" for column in plan['kept_columns'])
+        return sql
+
+    @staticmethod
+    def log_pushdown_savings(plan: dict, metrics=None):
+        if not plan or not metrics:
+            return
+        extract = metrics.stages.get('extract', {})
+        rows, extracted_bytes = extract.get('rows_out', 0), extract.get('bytes_out', 0)
+        if not rows:
+            return
+        # Dropped columns are assumed as wide as the average kept column; rows removed by DISTINCT/IS NOT NULL are not counted.
+        saved = extracted_bytes / len(plan['kept_columns']) * len(plan['dropped_columns'])
+        logging.info(f"Pushdown saved an estimated {saved / 1048576:.1f} MB over {rows} rows by not extracting {len(plan['dropped_columns'])} columns "
+                     f"({extracted_bytes / 1048576:.1f} MB extracted)")
+
+    @staticmethod
+    def build_partition_queries(query, partition_spec: dict, db_connection, params: dict = None):
+        partition_type = partition_spec.get('type', 'range')
+        partitions = int(partition_spec.get('partitions', 4))
+        column = partition_spec.get('column')
+
+        if partition_type == 'hash':
+            # ORA_HASH(NULL) is NULL, so rows with a NULL partition column go to bucket 0.
+            sql = f"SELECT * FROM ({query}) src WHERE NVL(ORA_HASH(src.{column}, {partitions - 1}), 0) = :bucket"
+            return [(sql, {**(params or {}), 'bucket': bucket}) for bucket in range(partitions)]
+
+        if partition_type == 'rowid':
+            match = re.search(r"from\s+([\w$#.]+)", query, re.IGNORECASE)
+            table = partition_spec.get('table') or (match.group(1) if match else None)
+            if not table:
+                raise ValueError(f"Cannot determine the base table for ROWID partitioning of: {query}")
+            ranges = pd.read_sql(text(f"""
+                SELECT ROWIDTOCHAR(MIN(rid)) AS lo, ROWIDTOCHAR(MAX(rid)) AS hi
+                FROM (SELECT ROWID AS rid, NTILE(:partitions) OVER (ORDER BY ROWID) AS nt FROM {table})
+                GROUP BY nt ORDER BY nt
+            """), con=db_connection, params={'partitions': partitions})
+            ranges.columns = ranges.columns.str.lower()
+            sql = db_process.restrict_base_table(query, "ROWID BETWEEN CHARTOROWID(:lo) AND CHARTOROWID(:hi)")
+            return [(sql, {**(params or {}), 'lo': row.lo, 'hi': row.hi}) for row in ranges.itertuples(index=False)]
+
+        if partition_type == 'range':
+            bounds = pd.read_sql(text(f"SELECT MIN(src.{column}) AS lo, MAX(src.{column}) AS hi FROM ({query}) src"), con=db_connection, params=params or {})
+            lo, hi = bounds.iloc[0, 0], bounds.iloc[0, 1]
+            if pd.isna(lo) or pd.isna(hi):
+                return [(query, params)]
+
+            if isinstance(lo, (datetime, pd.Timestamp)):
+                lo, hi = pd.Timestamp(lo), pd.Timestamp(hi)
+                edges = [lo + (hi - lo) * i / partitions for i in range(partitions)] + [hi]
+                edges = [edge.to_pydatetime() for edge in edges]
+            else:
+                step = (hi - lo) / partitions
+                edges = [lo + step * i for i in range(partitions)] + [hi]
+                if float(lo).is_integer() and float(hi).is_integer():
+                    edges = [int(edge) for edge in edges]
+            # Narrow ranges (down to MIN == MAX) collapse duplicate edges; keep at least one range.
+            edges = sorted(set(edges))
+            if len(edges) == 1:
+                edges = edges * 2
+
+            queries = []
+            for i in range(len(edges) - 1):
+                upper_op = "<=" if i == len(edges) - 2 else "<"
+                sql = f"SELECT * FROM ({query}) src WHERE src.{column} >= :lo AND src.{column} {upper_op} :hi"
+                if i == 0:
+                    # Range predicates never match NULL, so the first partition also carries the NULL rows.
+                    sql = f"SELECT * FROM ({query}) src WHERE (src.{column} >= :lo AND src.{column} {upper_op} :hi) OR src.{column} IS NULL"
+                queries.append((sql, {**(params or {}), 'lo': edges[i], 'hi': edges[i + 1]}))
+            return queries
+
+        raise ValueError(f"Unsupported partition type: {partition_type}")
+
+    @staticmethod
+    def set_partition_concurrency(limit: int):
+        db_process._partition_slots = threading.BoundedSemaphore(limit)
+
+    @staticmethod
+    def run_partitioned_pipeline(partition_queries, from_connection, to_connection, table_name, destination_columns, to_db: str = None,
+                                 target_schema: str = None, loader: str = 'auto', chunksize: int = 50000, max_workers: int = 4,
+                                 load_mode: str = 'append', key_columns: list = None, reject_path: str = None, handle_null: str = 'drop', seen_hashes=None,
+                                 pipeline_options: dict = None, metrics=None, fetch_plan: dict = None, loader_options: dict = None):
+
+        def run_partition(partition_no, sql, params):
+            with db_process._partition_slots:
+                partition_start = time.perf_counter()
+                chunks = db_process.extract_data_in_chunks(sql, from_connection, chunksize, params, fetch_plan)
+                try:
+                    if pipeline_options:
+                        loaded = db_process.run_pipelined(chunks, table_name, to_connection, destination_columns, to_db, target_schema, loader,
+                                                          load_mode, key_columns, reject_path, handle_null, seen_hashes, metrics=metrics,
+                                                          loader_options=loader_options, **pipeline_options)
+                    else:
+                        loaded = db_process.run_chunked_pipeline(chunks, table_name, to_connection, destination_columns, to_db, target_schema, loader,
+                                                                 load_mode, key_columns, reject_path, handle_null, seen_hashes, metrics, loader_options)
+                finally:
+                    chunks.close()
+                elapsed = time.perf_counter() - partition_start
+                rate = loaded / elapsed if elapsed > 0 else 0
+                logging.info(f"Partition {partition_no}/{len(partition_queries)} {params}: {loaded} rows in {elapsed:.2f}s ({rate:.0f} rows/s)")
+                return loaded
+
+        total_loaded = 0
+        errors = []
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(run_partition, partition_no, sql, params): partition_no
+                       for partition_no, (sql, params) in enumerate(partition_queries, start=1)}
+            for future in as_completed(futures):
+                try:
+                    total_loaded += future.result()
+                except Exception as e:
+                    logging.error(f"Partition {futures[future]} failed: {e}")
+                    errors.append(e)
+
+        if errors:
+            raise ValueError(f"{len(errors)} of {len(partition_queries)} partitions failed: {errors[0]}")
+        return total_loaded
+
+    @staticmethod
+    def memory_snapshot(df=None):
+        frame_mb = df.memory_usage(index=False).sum() / 1048576 if df is not None else 0
+        try:
+            import psutil
+            rss_mb = psutil.Process().memory_info().rss / 1048576
+            return f"frame {frame_mb:.1f} MB, rss {rss_mb:.1f} MB"
+        except ImportError:
+            pass
+        try:
+            import resource
+            peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1048576 if sys.platform == 'darwin' else 1024)
+            return f"frame {frame_mb:.1f} MB, peak rss {peak_mb:.1f} MB"
+        except ImportError:
+            return f"frame {frame_mb:.1f} MB"
+
+    @staticmethod
+    def create_row_hash_set(dedup: str = 'chunk', capacity: int = 10000000, error_rate: float = 0.001):
+        if dedup == 'exact':
+            return RowHashSet()
+        if dedup == 'bloom':
+            return BloomFilter(capacity, error_rate)
+        return None
+
+    @staticmethod
+    def hash_rows(df):
+        # A chunk with nulls reads integer columns as float; hash integral floats as Int64 so the same row hashes alike in every chunk.
+        integral_floats = {}
+        for column in df.columns:
+            if pd.api.types.is_float_dtype(df[column].dtype):
+                values = df[column].to_numpy()
+                finite = values[~np.isnan(values)]
+                if (np.abs(finite) < 2 ** 63).all() and (finite == np.floor(finite)).all():
+                    integral_floats[column] = df[column].astype('Int64')
+        hashable = df.assign(**integral_floats) if integral_floats else df
+        return pd.util.hash_pandas_object(hashable, index=False).to_numpy()
+
+    @staticmethod
+    def transform_data(df, source_columns, destination_columns, handle_null='drop', seen_hashes=None):
         try:
             logging.info(f"Initial DataFrame columns: {df.columns.tolist()}")
-            logging.info(f"Initial DataFrame shape: {df.shape}")
+            logging.info(f"Initial DataFrame shape: {df.shape} ({db_process.memory_snapshot(df)})")
 
+            # Shallow copy: renaming, dropping and filling below must not change the caller's frame, whose size the metrics still measure.
+            df = df.copy(deep=False)
             df.columns = df.columns.astype(str).str.lower()
-            df = df.drop_duplicates()
-
-            if handle_null == 'drop':
-                df = df.dropna()
-            elif handle_null == 'fill':
-                df = df.fillna(0)
 
             matching_columns = [col for col in destination_columns if col in df.columns]
 
@@ -199,9 +903,32 @@ class db_process:
             missing_columns = set(df.columns) - set(destination_columns)
             if missing_columns:
                 logging.warning(f"The following columns are in the source but not in the destination: {missing_columns}")
+                df = df.drop(columns=list(missing_columns))
+            if df.columns.tolist() != matching_columns:
+                df = df[matching_columns]
+            logging.info(f"After projection: {df.shape} ({db_process.memory_snapshot(df)})")
+
+            keep = np.ones(len(df), dtype=bool)
+            for column in df.columns:
+                nulls = df[column].isna().to_numpy()
+                if not nulls.any():
+                    continue
+                if handle_null == 'drop':
+                    keep &= ~nulls
+                elif handle_null == 'fill':
+                    df[column] = df[column].fillna(0)
+
+            row_hashes = db_process.hash_rows(df)
+            if seen_hashes is None:
+                unique = ~pd.Series(row_hashes).duplicated().to_numpy()
+                keep &= unique
+            else:
+                candidates = np.flatnonzero(keep)
+                keep[candidates] = seen_hashes.add(row_hashes[candidates])
+            del row_hashes
 
-            df_transformed = df[matching_columns]
-            logging.info(f"Transformed DataFrame shape: {df_transformed.shape}")
+            df_transformed = df[keep] if not keep.all() else df
+            logging.info(f"Transformed DataFrame shape: {df_transformed.shape} ({db_process.memory_snapshot(df_transformed)})")
 
             return df_transformed
         except Exception as e:
@@ -209,16 +936,249 @@ class db_process:
             return None
 
     @staticmethod
-    def load_data_to_db(df, table_name, db_connection):
+    def load_data_to_db(df, table_name, db_connection, db_type: str = None, schema: str = None, loader: str = 'auto',
+                        load_mode: str = 'append', key_columns: list = None, load_stats: dict = None, loader_options: dict = None):
+        # loader_options (e.g. batch_size, use_infile) go to the bulk loader as keyword arguments.
+        loader_options = loader_options or {}
         try:
             logging.info(f"Attempting to load {len(df)} rows into the table {table_name},{db_connection}")
-            df.to_sql(table_name, con=db_connection, if_exists='append', index=False)
+            if load_mode == 'merge':
+                counts = ld.db_loader.merge_load(df, table_name, db_connection, db_type, key_columns, schema=schema, loader=loader, **loader_options)
+                if load_stats is not None:
+                    for key, value in counts.items():
+                        load_stats[key] = load_stats.get(key, 0) + value
+                return counts['inserted'] + counts['updated']
+            if db_type and loader != 'to_sql':
+                return ld.db_loader.bulk_load(df, table_name, db_connection, db_type, schema=schema, loader=loader, **loader_options)
+            df.to_sql(table_name, con=db_connection, schema=schema, if_exists='append', index=False, chunksize=loader_options.get('batch_size'))
             logging.info(f"Loaded {len(df)} rows into the table {table_name}")
+            return len(df)
         except Exception as e:
             logging.error(f"Error loading data into {table_name}: {e}")
+            return None
+
+    @staticmethod
+    def transform_chunk(chunk_no, chunk, destination_columns, to_db: str = None, reject_path: str = None, handle_null: str = 'drop',
+                        seen_hashes=None, coercion_plan: dict = None, metrics=None):
+        if chunk_no == 1:
+            with db_process.stage_timer(metrics, 'type_check'):
+                if db_process.check_data_type_mismatch(chunk, destination_columns, to_db):
+                    raise ValueError("Data type mismatch")
+
+        rows_in, bytes_in = len(chunk), em.RunMetrics.frame_bytes(chunk) if metrics else 0
+        with db_process.stage_timer(metrics, 'transform'):
+            transformed = db_process.transform_data(chunk, chunk.columns.tolist(), destination_columns.keys(), handle_null, seen_hashes)
+        if transformed is None:
+            raise ValueError(f"Transform failed for chunk {chunk_no}")
+        if metrics:
+            metrics.add_rows('transform', rows_in, len(transformed), bytes_in, em.RunMetrics.frame_bytes(transformed))
+
+        rows_in = len(transformed)
+        with db_process.stage_timer(metrics, 'coerce'):
+            if coercion_plan is None:
+                coercion_plan = db_process.build_coercion_plan(dict(transformed.dtypes), destination_columns, to_db)
+            transformed = db_process.coerce_chunk(transformed, coercion_plan, reject_path)
+        if metrics:
+            metrics.add_rows('coerce', rows_in, len(transformed))
+        return transformed, coercion_plan
+
+    @staticmethod
+    def stage_timer(metrics, stage: str):
+        return metrics.time_stage(stage) if metrics else nullcontext()
 
     @staticmethod
-    def etl_process(etl_pr_dml: str, from_db: str, to_db: str, query: str, table_name: str, target_schema: str = None,from_db_config: dict = None, to_db_config: dict = None, etl_pr_dml_db_config: dict = None):
+    def timed_chunks(chunks, metrics=None):
+        # Times the source fetch separately from the consumer of each chunk.
+        chunk_iter = iter(chunks)
+        while True:
+            with db_process.stage_timer(metrics, 'extract'):
+                chunk = next(chunk_iter, None)
+            if chunk is None:
+                return
+            if metrics:
+                metrics.add_rows('extract', rows_out=len(chunk), bytes_out=em.RunMetrics.frame_bytes(chunk))
+            yield chunk
+
+    @staticmethod
+    def load_chunk(transformed, table_name, to_connection, to_db, target_schema, loader, load_mode, key_columns, load_stats, metrics=None,
+                   loader_options: dict = None):
+        with db_process.stage_timer(metrics, 'load'):
+            loaded = db_process.load_data_to_db(transformed, table_name, to_connection, to_db, target_schema, loader, load_mode, key_columns, load_stats,
+                                                loader_options)
+        if metrics and loaded is not None:
+            metrics.add_rows('load', len(transformed), loaded, em.RunMetrics.frame_bytes(transformed))
+        return loaded
+
+    @staticmethod
+    def run_chunked_pipeline(chunks, table_name, to_connection, destination_columns, to_db: str = None, target_schema: str = None, loader: str = 'auto',
+                             load_mode: str = 'append', key_columns: list = None, reject_path: str = None, handle_null: str = 'drop', seen_hashes=None,
+                             metrics=None, loader_options: dict = None):
+        total_extracted = 0
+        total_loaded = 0
+        coercion_plan = None
+        load_stats = {}
+        pipeline_start = time.perf_counter()
+
+        for chunk_no, chunk in enumerate(db_process.timed_chunks(chunks, metrics), start=1):
+            total_extracted += len(chunk)
+
+            transform_start = time.perf_counter()
+            transformed, coercion_plan = db_process.transform_chunk(chunk_no, chunk, destination_columns, to_db, reject_path, handle_null,
+                                                                    seen_hashes, coercion_plan, metrics)
+            transform_time = time.perf_counter() - transform_start
+
+            load_start = time.perf_counter()
+            loaded = db_process.load_chunk(transformed, table_name, to_connection, to_db, target_schema, loader, load_mode, key_columns, load_stats, metrics,
+                                           loader_options)
+            if loaded is None:
+                raise ValueError(f"Load failed for chunk {chunk_no}")
+            load_time = time.perf_counter() - load_start
+
+            total_loaded += loaded
+            logging.info(f"Chunk {chunk_no}: {len(chunk)} rows in, {loaded} rows loaded "
+                         f"(transform {transform_time:.2f}s, load {load_time:.2f}s)")
+
+        elapsed = time.perf_counter() - pipeline_start
+        rate = total_loaded / elapsed if elapsed > 0 else 0
+        logging.info(f"Chunked pipeline finished: {total_extracted} rows extracted, {total_loaded} rows loaded "
+                     f"in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        if load_stats:
+            logging.info(f"Merge totals for {table_name}: {load_stats.get('inserted', 0)} inserted, {load_stats.get('updated', 0)} updated")
+        return total_loaded
+
+    @staticmethod
+    def run_pipelined(chunks, table_name, to_connection, destination_columns, to_db: str = None, target_schema: str = None, loader: str = 'auto',
+                      load_mode: str = 'append', key_columns: list = None, reject_path: str = None, handle_null: str = 'drop', seen_hashes=None,
+                      transform_workers: int = 2, queue_size: int = 4, metrics=None, loader_options: dict = None):
+        # fetcher thread -> transform pool -> bounded queue of futures (in chunk order) -> loader on the calling thread.
+        # At most queue_size + 1 chunks are in flight, whatever the relative speed of the stages.
+        load_queue = queue.Queue(maxsize=queue_size)
+        stop = threading.Event()
+        stats_lock = threading.Lock()
+        plan_lock = threading.Lock()
+        plan = {}
+        stats = {'extracted': 0, 'fetch_busy': 0.0, 'fetch_stall': 0.0, 'transform_busy': 0.0, 'load_busy': 0.0, 'load_stall': 0.0,
+                 'occupancy_samples': 0, 'occupancy_total': 0}
+
+        def transform(chunk_no, chunk):
+            transform_start = time.perf_counter()
+            with plan_lock:
+                coercion_plan = plan.get('coercion')
+            transformed, coercion_plan = db_process.transform_chunk(chunk_no, chunk, destination_columns, to_db, reject_path, handle_null,
+                                                                    seen_hashes, coercion_plan, metrics)
+            with plan_lock:
+                plan.setdefault('coercion', coercion_plan)
+            with stats_lock:
+                stats['transform_busy'] += time.perf_counter() - transform_start
+            return len(chunk), transformed
+
+        def put(item):
+            # Blocks while the loader is behind; re-checks stop so a failed load does not leave the fetcher hanging.
+            stall_start = time.perf_counter()
+            while not stop.is_set():
+                try:
+                    load_queue.put(item, timeout=0.5)
+                    break
+                except queue.Full:
+                    continue
+            stats['fetch_stall'] += time.perf_counter() - stall_start
+
+        def fetch(executor):
+            try:
+                chunk_iter = db_process.timed_chunks(chunks, metrics)
+                chunk_no = 0
+                while not stop.is_set():
+                    fetch_start = time.perf_counter()
+                    chunk = next(chunk_iter, None)
+                    stats['fetch_busy'] += time.perf_counter() - fetch_start
+                    if chunk is None:
+                        break
+                    chunk_no += 1
+                    stats['extracted'] += len(chunk)
+                    put((chunk_no, executor.submit(transform, chunk_no, chunk)))
+            except Exception as e:
+                logging.error(f"Fetcher failed: {e}")
+                put((None, e))
+            finally:
+                put(None)
+
+        total_loaded = 0
+        load_stats = {}
+        pipeline_start = time.perf_counter()
+        executor = ThreadPoolExecutor(max_workers=transform_workers)
+        fetcher = threading.Thread(target=fetch, args=(executor,), name=f"etl-fetch-{table_name}", daemon=True)
+        fetcher.start()
+        try:
+            while True:
+                stall_start = time.perf_counter()
+                stats['occupancy_samples'] += 1
+                stats['occupancy_total'] += load_queue.qsize()
+                item = load_queue.get()
+                if item is None:
+                    stats['load_stall'] += time.perf_counter() - stall_start
+                    break
+                chunk_no, pending = item
+                if chunk_no is None:
+                    raise pending
+                rows_in, transformed = pending.result()
+                stats['load_stall'] += time.perf_counter() - stall_start
+
+                load_start = time.perf_counter()
+                loaded = db_process.load_chunk(transformed, table_name, to_connection, to_db, target_schema, loader, load_mode, key_columns, load_stats, metrics,
+                                               loader_options)
+                if loaded is None:
+                    raise ValueError(f"Load failed for chunk {chunk_no}")
+                load_time = time.perf_counter() - load_start
+                stats['load_busy'] += load_time
+                total_loaded += loaded
+                logging.info(f"Chunk {chunk_no}: {rows_in} rows in, {loaded} rows loaded (load {load_time:.2f}s, queue {load_queue.qsize()}/{queue_size})")
+        finally:
+            stop.set()
+            # Drain so a fetcher blocked on put() sees stop, then let in-flight transforms finish.
+            while fetcher.is_alive():
+                try:
+                    load_queue.get(timeout=0.5)
+                except queue.Empty:
+                    pass
+            executor.shutdown(wait=True)
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+        elapsed = time.perf_counter() - pipeline_start
+        db_process.log_pipeline_stats(table_name, stats, elapsed, total_loaded, transform_workers, queue_size)
+        if load_stats:
+            logging.info(f"Merge totals for {table_name}: {load_stats.get('inserted', 0)} inserted, {load_stats.get('updated', 0)} updated")
+        return total_loaded
+
+    @staticmethod
+    def log_pipeline_stats(table_name, stats, elapsed, total_loaded, transform_workers: int, queue_size: int):
+        def share(seconds, workers=1):
+            return 100 * seconds / (elapsed * workers) if elapsed > 0 else 0
+
+        rate = total_loaded / elapsed if elapsed > 0 else 0
+        occupancy = stats['occupancy_total'] / stats['occupancy_samples'] if stats['occupancy_samples'] else 0
+        logging.info(f"Pipelined run for {table_name}: {stats['extracted']} rows extracted, {total_loaded} rows loaded in {elapsed:.2f}s ({rate:.0f} rows/s)")
+        logging.info(f"  fetch     busy {stats['fetch_busy']:.2f}s ({share(stats['fetch_busy']):.0f}%), stalled on full queue {stats['fetch_stall']:.2f}s")
+        logging.info(f"  transform busy {stats['transform_busy']:.2f}s ({share(stats['transform_busy'], transform_workers):.0f}% of {transform_workers} workers)")
+        logging.info(f"  load      busy {stats['load_busy']:.2f}s ({share(stats['load_busy']):.0f}%), waiting on upstream {stats['load_stall']:.2f}s")
+        logging.info(f"  load queue average occupancy {occupancy:.1f}/{queue_size}")
+        if stats['fetch_stall'] > stats['load_stall']:
+            logging.info("  bottleneck: target load (fetcher spent longer waiting on the queue than the loader)")
+        elif share(stats['transform_busy'], transform_workers) > share(stats['fetch_busy']):
+            logging.info("  bottleneck: transform (consider more transform_workers)")
+        else:
+            logging.info("  bottleneck: source fetch")
+
+    @staticmethod
+    def etl_process(etl_pr_dml: str, from_db: str, to_db: str, query: str, table_name: str, target_schema: str = None,from_db_config: dict = None, to_db_config: dict = None, etl_pr_dml_db_config: dict = None, chunksize: int = None, loader: str = 'auto', partition_spec: dict = None, max_workers: int = 4, incremental: dict = None,
+                    load_mode: str = 'append', key_columns: list = None, reject_path: str = None, handle_null: str = 'drop',
+                    dedup: str = 'chunk', dedup_capacity: int = 10000000, staging_dir: str = None, staging_format: str = 'arrow',
+                    pipelined: bool = False, transform_workers: int = 2, queue_size: int = 4,
+                    collect_metrics: bool = True, metrics_path: str = None, profile_path: str = None, validate: dict = None,
+                    pushdown: bool = True, oracle_fetch: bool = True, lob_inline_limit: int = 1048576, loader_options: dict = None):
+        # Local, not a module global: JobRunner calls etl_process concurrently from worker threads.
+        run_metrics, loaded_rows, log_etl_db_config = None, None, None
+        profiler = em.RunMetrics.start_profile(profile_path)
         try:
             start_time = datetime.now()
 
@@ -228,7 +1188,11 @@ class db_process:
             else:
                 process_name = f"ETL_{from_db}_to_{to_db}_{table_name}"
 
-            global log_etl_db_config
+            run_metrics = em.RunMetrics(process_name) if collect_metrics else None
+            if validate and incremental and load_mode == 'append':
+                # A failed validation keeps the watermark, so the next append run would load the same window twice.
+                raise ValueError("validate with incremental runs needs load_mode='merge'; append would duplicate the window after a failed validation")
+
             log_etl_db_config = db_process.from_get_connection(db_type=etl_pr_dml, ints=1, fm_db=etl_pr_dml_db_config)
             db_process.log_etl_process(log_etl_db_config, process_name, 'STARTED', 'ETL process initiated',
                                     start_time=start_time, from_table=query, to_table=table_name)
@@ -242,9 +1206,100 @@ class db_process:
                 return
 
             logging.info(f"Connected to {from_db} and {to_db}")
+            if run_metrics:
+                from_connection = run_metrics.attach(from_connection, 'source')
+                to_connection = run_metrics.attach(to_connection, 'target')
+            reject_path = reject_path or f"{table_name}_rejects.csv"
+
+            stage, resuming = None, False
+            if staging_dir:
+                import staging
+                stage = staging.ChunkStage(os.path.join(staging_dir, re.sub(r"\W+", "_", process_name)), staging_format)
+                resuming = stage.can_resume(query, table_name)
+
+            extract_query, extract_params, high_mark = query, None, None
+            if incremental and resuming:
+                high_mark = stage.manifest['extra'].get('high_mark')
+            elif incremental:
+                last_mark = db_process.get_watermark(log_etl_db_config, process_name, query, table_name)
+                planned = db_process.build_incremental_query(query, incremental, last_mark, from_connection)
+                if planned is None:
+                    db_process.log_etl_process(log_etl_db_config, process_name, 'COMPLETED', f'No new rows above watermark {last_mark}',
+                                            start_time=start_time, end_time=datetime.now(), from_table=query, to_table=table_name)
+                    return 0
+                extract_query, extract_params, high_mark = planned
+                logging.info(f"Incremental extract on {incremental.get('column', 'ORA_ROWSCN')}: ({last_mark}, {high_mark}]")
+
+            destination_columns = db_process.get_column_metadata_from_db(to_connection, table_name, to_db, target_schema)
+            # Chunked runs only drop duplicates across chunks with dedup='exact' or 'bloom'; the default 'chunk' keeps memory bounded by the chunk.
+            global_dedup = not (chunksize or partition_spec or stage or pipelined) or dedup in ['exact', 'bloom']
+            pushdown_plan = None
+            if pushdown and from_connection is not None and not resuming:
+                pushdown_plan = db_process.plan_pushdown(extract_query, destination_columns, from_connection, from_db, handle_null, extract_params, global_dedup)
+            pushed_query = db_process.apply_pushdown(extract_query, pushdown_plan)
+            fetch_plan = None
+            if oracle_fetch and from_db == "Oracle" and from_connection is not None and not resuming:
+                fetch_plan = db_process.plan_oracle_fetch(pushed_query, from_connection, extract_params, lob_inline_limit)
+
+            if chunksize or partition_spec or stage or pipelined:
+                seen_hashes = db_process.create_row_hash_set(dedup, dedup_capacity)
+                pipeline_options = {'transform_workers': transform_workers, 'queue_size': queue_size} if pipelined else None
+                if partition_spec:
+                    if stage:
+                        logging.warning("Staging is only used for single-stream chunked runs; ignoring staging_dir for partitioned extraction")
+                        stage = None
+                    partition_queries = db_process.build_partition_queries(extract_query, partition_spec, from_connection, extract_params)
+                    partition_queries = [(db_process.apply_pushdown(sql, pushdown_plan), sql_params) for sql, sql_params in partition_queries]
+                    loaded_rows = db_process.run_partitioned_pipeline(partition_queries, from_connection, to_connection, table_name, destination_columns,
+                                                                      to_db, target_schema, loader, chunksize or 50000, max_workers, load_mode, key_columns,
+                                                                      reject_path, handle_null, seen_hashes, pipeline_options, run_metrics, fetch_plan, loader_options)
+                else:
+                    if stage and not resuming:
+                        stage.reset(query, table_name)
+                        source_chunks = db_process.extract_data_in_chunks(pushed_query, from_connection, chunksize or 50000, extract_params, fetch_plan)
+                        try:
+                            stage.stage_chunks(source_chunks)
+                        finally:
+                            source_chunks.close()
+                        stage.mark_extract_complete(high_mark=high_mark if incremental else None)
+                    if stage:
+                        if pipeline_options:
+                            # iter_unloaded marks a chunk loaded when the next one is requested, which only holds for a sequential consumer.
+                            logging.warning("Staged chunks are loaded sequentially; ignoring pipelined for this run")
+                            pipeline_options = None
+                        chunks = stage.iter_unloaded()
+                    else:
+                        chunks = db_process.extract_data_in_chunks(pushed_query, from_connection, chunksize or 50000, extract_params, fetch_plan)
+                    try:
+                        if pipeline_options:
+                            loaded_rows = db_process.run_pipelined(chunks, table_name, to_connection, destination_columns, to_db, target_schema, loader,
+                                                                   load_mode, key_columns, reject_path, handle_null, seen_hashes, metrics=run_metrics,
+                                                                   loader_options=loader_options, **pipeline_options)
+                        else:
+                            loaded_rows = db_process.run_chunked_pipeline(chunks, table_name, to_connection, destination_columns, to_db, target_schema, loader,
+                                                                          load_mode, key_columns, reject_path, handle_null, seen_hashes, run_metrics, loader_options)
+                    finally:
+                        chunks.close()
+
+                if validate:
+                    db_process.validate_load(validate, from_connection, from_db, query, to_connection, to_db, table_name, target_schema,
+                                             destination_columns, key_columns, handle_null, run_metrics, global_dedup, incremental, high_mark)
+                if incremental:
+                    db_process.set_watermark(log_etl_db_config, process_name, high_mark, incremental.get('column'), incremental.get('type', 'timestamp'), query, table_name)
+                if stage:
+                    stage.cleanup()
+                db_process.log_pushdown_savings(pushdown_plan, run_metrics)
+
+                end_time = datetime.now()
+                db_process.log_etl_process(log_etl_db_config, process_name, 'COMPLETED', f'ETL process completed successfully ({loaded_rows} rows, chunksize {chunksize or 50000})',
+                                        start_time=start_time, end_time=end_time, from_table=query, to_table=table_name)
+                return loaded_rows
 
             if from_connection:
-                source_data = db_process.extract_data_from_db(query, from_connection)
+                with db_process.stage_timer(run_metrics, 'extract'):
+                    source_data = db_process.extract_data_from_db(pushed_query, from_connection, extract_params, fetch_plan)
+                if run_metrics and source_data is not None:
+                    run_metrics.add_rows('extract', rows_out=len(source_data), bytes_out=em.RunMetrics.frame_bytes(source_data))
 
             if source_data is None or source_data.empty:
                 db_process.log_etl_process(log_etl_db_config, process_name, 'FAILED',
@@ -252,27 +1307,88 @@ class db_process:
                                         from_table=query, to_table=table_name)
                 return
 
-            destination_columns = db_process.get_columns_and_types_from_db(to_connection, table_name, to_db, target_schema)
-
-            if db_process.check_data_type_mismatch(source_data, destination_columns):
+            with db_process.stage_timer(run_metrics, 'type_check'):
+                type_mismatch = db_process.check_data_type_mismatch(source_data, destination_columns, to_db)
+            if type_mismatch:
                 db_process.log_etl_process(log_etl_db_config, process_name, 'FAILED', 'Data type mismatch',
                                         start_time=start_time, from_table=query, to_table=table_name)
                 return
 
-            transformed_data = db_process.transform_data(source_data, source_data.columns.tolist(), destination_columns.keys())
+            with db_process.stage_timer(run_metrics, 'transform'):
+                transformed_data = db_process.transform_data(source_data, source_data.columns.tolist(), destination_columns.keys(), handle_null)
+            with db_process.stage_timer(run_metrics, 'coerce'):
+                coercion_plan = db_process.build_coercion_plan(dict(transformed_data.dtypes), destination_columns, to_db)
+                transformed_data = db_process.coerce_chunk(transformed_data, coercion_plan, reject_path)
+            if run_metrics:
+                run_metrics.add_rows('transform', len(source_data), len(transformed_data), em.RunMetrics.frame_bytes(source_data),
+                                     em.RunMetrics.frame_bytes(transformed_data))
+
+            loaded_rows = db_process.load_chunk(transformed_data, table_name, to_connection, to_db, target_schema, loader, load_mode, key_columns, None, run_metrics,
+                                                loader_options)
+            if loaded_rows is None:
+                raise ValueError("Load into target failed")
 
-            db_process.load_data_to_db(transformed_data, table_name, to_connection)
+            if validate:
+                db_process.validate_load(validate, from_connection, from_db, query, to_connection, to_db, table_name, target_schema,
+                                         destination_columns, key_columns, handle_null, run_metrics, global_dedup, incremental, high_mark)
+            if incremental:
+                db_process.set_watermark(log_etl_db_config, process_name, high_mark, incremental.get('column'), incremental.get('type', 'timestamp'), query, table_name)
+            db_process.log_pushdown_savings(pushdown_plan, run_metrics)
 
             end_time = datetime.now()
             db_process.log_etl_process(log_etl_db_config, process_name, 'COMPLETED', 'ETL process completed successfully',
                                     start_time=start_time, end_time=end_time, from_table=query, to_table=table_name)
+            return loaded_rows
 
         except Exception as e:
             logging.error(f"ETL process failed: {e}")
             end_time = datetime.now()
-            db_process.log_etl_process(log_etl_db_config, process_name, 'FAILED', f"ETL process failed: {e}",
-                                    start_time=start_time, end_time=end_time, from_table=query, to_table=table_name)
-            
+            if log_etl_db_config is not None:
+                db_process.log_etl_process(log_etl_db_config, process_name, 'FAILED', f"ETL process failed: {e}",
+                                        start_time=start_time, end_time=end_time, from_table=query, to_table=table_name)
+        finally:
+            if run_metrics:
+                db_process.finish_run_metrics(run_metrics, loaded_rows, log_etl_db_config, metrics_path)
+            em.RunMetrics.stop_profile(profiler, profile_path)
+
+    @staticmethod
+    def validate_load(validate: dict, from_connection, from_db: str, query: str, to_connection, to_db: str, table_name: str, target_schema: str,
+                      destination_columns: dict, key_columns: list = None, handle_null: str = 'drop', metrics=None, distinct: bool = True,
+                      incremental: dict = None, high_mark=None):
+        # Runs before the watermark moves so a failed validation re-extracts the same window next time.
+        # Incremental runs compare the source up to this run's high mark; rows that arrived since belong to the next window.
+        import validation_db
+        key_column = validate.get('key_column') or (key_columns[0] if key_columns else None)
+        if not key_column:
+            raise ValueError("Validation needs validate['key_column'] or key_columns")
+        target_table = f"{target_schema}.{table_name}" if target_schema else table_name
+        # Only the columns transform_data keeps are hashed; target-only columns (audit/default columns) were never loaded from the source.
+        source_columns = {column.lower() for column in db_process.probe_query_columns(query, from_connection)}
+        loaded_columns = {name: meta for name, meta in destination_columns.items() if name in source_columns}
+        source_query, source_params = query, None
+        if incremental:
+            source_query, source_params = db_process.bound_incremental_query(query, incremental), {'high_mark': high_mark}
+        with db_process.stage_timer(metrics, 'validate'):
+            report = validation_db.db_validation.validate(from_connection, from_db, source_query, to_connection, to_db, target_table, loaded_columns,
+                                                          key_column, validate.get('buckets', 16), validate.get('leaf_rows', 1000), handle_null,
+                                                          distinct=distinct, source_params=source_params)
+        if not report['matched'] and validate.get('fail_on_mismatch', True):
+            raise ValueError(f"Validation failed: source {report['source_rows']} rows, target {report['target_rows']} rows, "
+                             f"{len(report['mismatched_ranges'])} mismatched key ranges")
+        return report
+
+    @staticmethod
+    def finish_run_metrics(run_metrics, loaded_rows, log_engine, metrics_path: str = None):
+        try:
+            run_metrics.finish(loaded_rows)
+            run_metrics.persist(log_engine)
+            if metrics_path:
+                run_metrics.write_prometheus(metrics_path)
+        except Exception as e:
+            logging.warning(f"Could not record run metrics for {run_metrics.process_name}: {e}")
+
+atexit.register(db_process.close_log_writers)
+
 class ExcelProcess:
     @staticmethod
     def detect_file_type(file_path):
@@ -316,6 +1432,143 @@ class ExcelProcess:
             logging.error(f"Unexpected error: {e}")
             return None
 
+    @staticmethod
+    def clean_column_names(columns):
+        return pd.Index(columns).astype(str).str.strip().str.replace(r'\s+', '_', regex=True).str.lower()
+
+    # pandas' default NA markers, so pyarrow reads nulls the same way as the pandas sample that sized the table.
+    CSV_NA_VALUES = ['', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL',
+                     'NaN', 'None', 'n/a', 'nan', 'null']
+
+    @staticmethod
+    def iter_pandas_csv_chunks(file_path, chunksize: int = 100000, skip_rows: int = 0):
+        for chunk in pd.read_csv(file_path, chunksize=chunksize, memory_map=True):
+            if skip_rows:
+                skipped = min(skip_rows, len(chunk))
+                chunk, skip_rows = chunk.iloc[skipped:], skip_rows - skipped
+                if chunk.empty:
+                    continue
+            chunk.columns = ExcelProcess.clean_column_names(chunk.columns)
+            yield chunk
+
+    @staticmethod
+    def iter_csv_chunks(file_path, chunksize: int = 100000, infer_rows: int = 1000):
+        try:
+            import pyarrow as pa
+            import pyarrow.csv as pa_csv
+        except ImportError:
+            pa = None
+
+        if pa is None:
+            yield from ExcelProcess.iter_pandas_csv_chunks(file_path, chunksize)
+            return
+
+        # Column types come from the same pandas sample that creates the table, not from pyarrow's first block.
+        sample_dtypes = pd.read_csv(file_path, nrows=infer_rows).dtypes
+        column_types = {}
+        for column, dtype in sample_dtypes.items():
+            if pd.api.types.is_bool_dtype(dtype):
+                column_types[column] = pa.bool_()
+            elif pd.api.types.is_integer_dtype(dtype):
+                column_types[column] = pa.int64()
+            elif pd.api.types.is_float_dtype(dtype):
+                column_types[column] = pa.float64()
+            else:
+                column_types[column] = pa.string()
+        convert_options = pa_csv.ConvertOptions(column_types=column_types, null_values=ExcelProcess.CSV_NA_VALUES, strings_can_be_null=True)
+
+        yielded_rows = 0
+        try:
+            with pa.memory_map(file_path, 'r') as source:
+                reader = pa_csv.open_csv(source, convert_options=convert_options)
+                batches, buffered_rows = [], 0
+                for batch in reader:
+                    batches.append(batch)
+                    buffered_rows += batch.num_rows
+                    if buffered_rows >= chunksize:
+                        table = pa.Table.from_batches(batches)
+                        for start in range(0, table.num_rows - table.num_rows % chunksize, chunksize):
+                            chunk = table.slice(start, chunksize).to_pandas()
+                            chunk.columns = ExcelProcess.clean_column_names(chunk.columns)
+                            yielded_rows += len(chunk)
+                            yield chunk
+                        remainder = table.slice(table.num_rows - table.num_rows % chunksize)
+                        batches, buffered_rows = remainder.to_batches(), remainder.num_rows
+                if buffered_rows:
+                    chunk = pa.Table.from_batches(batches).to_pandas()
+                    chunk.columns = ExcelProcess.clean_column_names(chunk.columns)
+                    yielded_rows += len(chunk)
+                    yield chunk
+        except pa.ArrowInvalid as e:
+            # A value later in the file does not fit the sampled type; continue with pandas' per-chunk inference after the rows already yielded.
+            logging.warning(f"pyarrow could not convert {file_path} after {yielded_rows} rows ({e}); continuing with the pandas reader")
+            yield from ExcelProcess.iter_pandas_csv_chunks(file_path, chunksize, yielded_rows)
+
+    @staticmethod
+    def iter_excel_chunks(file_path, chunksize: int = 100000, sheet_name=None):
+        from openpyxl import load_workbook
+
+        workbook = load_workbook(file_path, read_only=True, data_only=True)
+        try:
+            if not sheet_name and len(workbook.sheetnames) > 1:
+                logging.warning(f"Multiple sheets found: {workbook.sheetnames}. Defaulting to the first sheet.")
+            worksheet = workbook[sheet_name] if sheet_name else workbook.worksheets[0]
+            rows = worksheet.iter_rows(values_only=True)
+            header = next(rows, None)
+            if header is None:
+                return
+            columns = ExcelProcess.clean_column_names(header)
+
+            buffer = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                buffer.append(row)
+                if len(buffer) >= chunksize:
+                    yield pd.DataFrame(buffer, columns=columns)
+                    buffer = []
+            if buffer:
+                yield pd.DataFrame(buffer, columns=columns)
+        finally:
+            workbook.close()
+
+    @staticmethod
+    def iter_file_chunks(file_path, file_type: str, chunksize: int = 100000, sheet_name=None, infer_rows: int = 1000):
+        if file_type == 'csv':
+            return ExcelProcess.iter_csv_chunks(file_path, chunksize, infer_rows)
+        return ExcelProcess.iter_excel_chunks(file_path, chunksize, sheet_name)
+
+    @staticmethod
+    def infer_schema_sample(file_path, file_type: str, infer_rows: int = 1000):
+        if file_type == 'csv':
+            sample = pd.read_csv(file_path, nrows=infer_rows)
+            sample.columns = ExcelProcess.clean_column_names(sample.columns)
+            return sample
+        return next(iter(ExcelProcess.iter_excel_chunks(file_path, infer_rows)), None)
+
+    @staticmethod
+    def stream_file_to_db(file_path, file_type: str, engine, table_name, db_type: str = None, chunksize: int = 100000, infer_rows: int = 1000):
+        sample = ExcelProcess.infer_schema_sample(file_path, file_type, infer_rows)
+        if sample is None or sample.empty:
+            raise ValueError(f"No data extracted from {file_path}")
+        ExcelProcess.create_table_from_df(sample, engine, table_name)
+        del sample
+
+        total_loaded = 0
+        stream_start = time.perf_counter()
+        for chunk_no, chunk in enumerate(ExcelProcess.iter_file_chunks(file_path, file_type, chunksize, infer_rows=infer_rows), start=1):
+            chunk_start = time.perf_counter()
+            loaded = ExcelProcess.insert_data_to_db(chunk, engine, table_name, db_type)
+            if loaded is None:
+                raise ValueError(f"Load failed for chunk {chunk_no} of {file_path}")
+            total_loaded += loaded
+            logging.info(f"Chunk {chunk_no}: loaded {loaded} rows into '{table_name}' in {time.perf_counter() - chunk_start:.2f}s")
+
+        elapsed = time.perf_counter() - stream_start
+        logging.info(f"Streamed {total_loaded} rows from {file_path} into '{table_name}' in {elapsed:.2f}s "
+                     f"({total_loaded / elapsed if elapsed > 0 else 0:.0f} rows/s)")
+        return total_loaded
+
     @staticmethod
     def create_table_from_df(df, engine, table_name):
         try:
@@ -330,22 +1583,34 @@ class ExcelProcess:
             logging.error(f"Error creating table '{table_name}': {e}")
 
     @staticmethod
-    def insert_data_to_db(df, engine, table_name):
+    def insert_data_to_db(df, engine, table_name, db_type: str = None):
         try:
-            df.to_sql(name=table_name, con=engine, index=False, if_exists='append', chunksize=500)
+            if db_type:
+                rows = ld.db_loader.bulk_load(df, table_name, engine, db_type)
+            else:
+                df.to_sql(name=table_name, con=engine, index=False, if_exists='append', chunksize=500)
+                rows = len(df)
             logging.info(f"Data successfully inserted into '{table_name}' table.")
+            return rows
         except Exception as e:
             logging.error(f"Error inserting data into '{table_name}' table: {e}")
+            return None
 
     @staticmethod
-    def etl_process_excel(file_path: str, to_db_nm: str, table_name: str, to_db_config: dict = None, etl_pr_dml_db_config: dict = None):
+    def etl_process_excel(file_path: str, to_db_nm: str, table_name: str, to_db_config: dict = None, etl_pr_dml_db_config: dict = None,
+                          chunksize: int = None, infer_rows: int = 1000):
         etl_db_cre = None  
         process_name = None 
         try:
             file_type = ExcelProcess.detect_file_type(file_path)
             if file_type is None:
                 return
-            if file_type == 'excel':
+            if not os.path.exists(file_path):
+                logging.error(f"ETL process failed: File not found: {file_path}.")
+                return
+            if chunksize:
+                df = None
+            elif file_type == 'excel':
                 df = ExcelProcess.extract_data_from_excel(file_path)
             elif file_type == 'csv':
                 df = pd.read_csv(file_path)
@@ -355,7 +1620,7 @@ class ExcelProcess:
                 logging.error(f"Unsupported file type: {file_type}.")
                 return
 
-            if df is None or df.empty:
+            if not chunksize and (df is None or df.empty):
                 logging.error(f"ETL process failed: No data extracted from {file_path}.")
                 return
             
@@ -379,12 +1644,22 @@ class ExcelProcess:
 
             db_process.log_etl_process(etl_db_cre, process_name, 'STARTED', 'ETL process initiated', start_time=start_time, from_table=file_path, to_table=table_name)
 
+            if chunksize:
+                loaded_rows = ExcelProcess.stream_file_to_db(file_path, file_type, con_db, table_name, to_db_nm, chunksize, infer_rows)
+                end_time = datetime.now()
+                db_process.log_etl_process(etl_db_cre, process_name, 'COMPLETED', f'ETL process completed successfully ({loaded_rows} rows, chunksize {chunksize})',
+                                           start_time=start_time, end_time=end_time, from_table=file_path, to_table=table_name)
+                return loaded_rows
+
             with con_db.begin():
                 ExcelProcess.create_table_from_df(df, con_db, table_name)
-                ExcelProcess.insert_data_to_db(df, con_db, table_name)
+                loaded_rows = ExcelProcess.insert_data_to_db(df, con_db, table_name, to_db_nm)
+            if loaded_rows is None:
+                raise ValueError("Load into target failed")
 
             end_time = datetime.now()
             db_process.log_etl_process(etl_db_cre, process_name, 'COMPLETED', 'ETL process completed successfully', start_time=start_time, end_time=end_time, from_table=file_path, to_table=table_name)
+            return loaded_rows
 
         except Exception as e:
             logging.error(f"ETL process failed: {e}")
@@ -396,43 +1671,49 @@ class ExcelProcess:
 
 
 
-etl_process_val=input('Enter The Process:')
-from_db=input('Enter The DB Name:')
-to_table_name=input('Enter the Table Name:')
+if __name__ == '__main__':
+    etl_process_val=input('Enter The Process:')
 
-etl_pr_dml="Oracle"
-etl_pr_dml_db_config={
-                        "host" : "localhost",
-                        "port" : 1521,
-                        "service_name" : "xepdb1",
-                        "user" : "hr",
-                        "password" : "hr1"
-                    }
+    if etl_process_val == 'batch':
+        import job_runner
+        sys.exit(job_runner.JobRunner.main([input('Enter The Manifest Path:')]))
 
-if __name__ == '__main__' and etl_process_val == 'db':
-    from_db_config={
-                    "host" : "localhost",
-                    "port" : 1521,
-                    "service_name" : "xepdb1",
-                    "user" : "hr",
-                    "password" : "hr1"
-                }
-    to_db_config={
-                    "host" : "localhost",
-                    "port" : 5432,
-                    "service_name" : "postgres",
-                    "user" : "postgres",
-                    "password" : "hr1"
-                }
-    
-    from_db, to_db, query, table_name,target_schema ="Oracle", "Postgresql", "SELECT * FROM ETL_PROCESS_DATA", "etl_process_data", "public"
-    db_process.etl_process(etl_pr_dml, from_db, to_db, query, table_name,target_schema,from_db_config,to_db_config,etl_pr_dml_db_config)
-else:
-    forexcel_to_db_config={
+    from_db=input('Enter The DB Name:')
+    to_table_name=input('Enter the Table Name:')
+
+    etl_pr_dml="Oracle"
+    etl_pr_dml_db_config={
                             "host" : "localhost",
                             "port" : 1521,
                             "service_name" : "xepdb1",
                             "user" : "hr",
                             "password" : "hr1"
                         }
-    ExcelProcess.etl_process_excel(r"d:\BH Store List.xlsx",from_db,to_table_name,forexcel_to_db_config,etl_pr_dml_db_config)
+
+    if etl_process_val == 'db':
+        from_db_config={
+                        "host" : "localhost",
+                        "port" : 1521,
+                        "service_name" : "xepdb1",
+                        "user" : "hr",
+                        "password" : "hr1"
+                    }
+        to_db_config={
+                        "host" : "localhost",
+                        "port" : 5432,
+                        "service_name" : "postgres",
+                        "user" : "postgres",
+                        "password" : "hr1"
+                    }
+        
+        from_db, to_db, query, table_name,target_schema ="Oracle", "Postgresql", "SELECT * FROM ETL_PROCESS_DATA", "etl_process_data", "public"
+        db_process.etl_process(etl_pr_dml, from_db, to_db, query, table_name,target_schema,from_db_config,to_db_config,etl_pr_dml_db_config)
+    else:
+        forexcel_to_db_config={
+                                "host" : "localhost",
+                                "port" : 1521,
+                                "service_name" : "xepdb1",
+                                "user" : "hr",
+                                "password" : "hr1"
+                            }
+        ExcelProcess.etl_process_excel(r"d:\BH Store List.xlsx",from_db,to_table_name,forexcel_to_db_config,etl_pr_dml_db_config)
@@ -0,0 +1,165 @@
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+import etlprocess as etl
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class JobRunner:
+
+    REQUIRED_KEYS = ['etl_pr_dml', 'from_db', 'to_db', 'query', 'table_name', 'from_db_config', 'to_db_config', 'etl_pr_dml_db_config']
+
+    JOB_OPTIONS = ['target_schema', 'chunksize', 'loader', 'partition_spec', 'max_workers', 'incremental', 'load_mode', 'key_columns',
+                   'reject_path', 'handle_null', 'dedup', 'dedup_capacity', 'staging_dir', 'staging_format', 'pipelined',
+                   'transform_workers', 'queue_size', 'collect_metrics', 'metrics_path', 'profile_path', 'validate',
+                   'pushdown', 'oracle_fetch', 'lob_inline_limit', 'loader_options']
+
+    @staticmethod
+    def load_manifest(manifest_path: str):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            if manifest_path.lower().endswith(('.yaml', '.yml')):
+                import yaml
+                manifest = yaml.safe_load(f)
+            else:
+                manifest = json.load(f)
+
+        defaults = manifest.get('defaults', {})
+        jobs = []
+        for position, entry in enumerate(manifest.get('jobs', [])):
+            job = {**defaults, **entry}
+            missing = [key for key in JobRunner.REQUIRED_KEYS if key not in job]
+            if missing:
+                raise ValueError(f"Job '{job.get('name', job.get('table_name', position))}' in manifest is missing required keys: {missing}")
+            job.setdefault('name', job['table_name'])
+            job['depends_on'] = list(job.get('depends_on') or [])
+            jobs.append(job)
+
+        names = [job['name'] for job in jobs]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate job names in manifest: {duplicates}")
+        for job in jobs:
+            unknown = set(job['depends_on']) - set(names)
+            if unknown:
+                raise ValueError(f"Job '{job['name']}' depends on unknown jobs: {unknown}")
+
+        JobRunner._check_cycles(jobs)
+        return manifest, jobs
+
+    @staticmethod
+    def _check_cycles(jobs):
+        dependencies = {job['name']: job['depends_on'] for job in jobs}
+        state = {}
+
+        def visit(name, path):
+            if state.get(name) == 'done':
+                return
+            if state.get(name) == 'visiting':
+                raise ValueError(f"Dependency cycle in manifest: {' -> '.join(path + [name])}")
+            state[name] = 'visiting'
+            for dependency in dependencies[name]:
+                visit(dependency, path + [name])
+            state[name] = 'done'
+
+        for name in dependencies:
+            visit(name, [])
+
+    @staticmethod
+    def _db_slots(job, db_slots):
+        # Sorted so two jobs never acquire the same pair of caps in opposite order.
+        return [db_slots[db] for db in sorted({job['from_db'], job['to_db']}) if db in db_slots]
+
+    @staticmethod
+    def run_job(job, db_slots):
+        slots = JobRunner._db_slots(job, db_slots)
+        for slot in slots:
+            slot.acquire()
+        try:
+            start = time.perf_counter()
+            options = {key: job[key] for key in JobRunner.JOB_OPTIONS if key in job}
+            rows = etl.db_process.etl_process(job['etl_pr_dml'], job['from_db'], job['to_db'], job['query'], job['table_name'],
+                                              from_db_config=job['from_db_config'], to_db_config=job['to_db_config'],
+                                              etl_pr_dml_db_config=job['etl_pr_dml_db_config'], **options)
+            return rows, time.perf_counter() - start
+        finally:
+            for slot in reversed(slots):
+                slot.release()
+
+    @staticmethod
+    def run_manifest(manifest_path: str):
+        manifest, jobs = JobRunner.load_manifest(manifest_path)
+        max_workers = manifest.get('max_workers', 4)
+        db_slots = {db: threading.BoundedSemaphore(limit) for db, limit in manifest.get('db_concurrency', {}).items()}
+        logging.info(f"Running {len(jobs)} jobs from {manifest_path} with {max_workers} workers, caps {manifest.get('db_concurrency', {})}")
+
+        pending = {job['name']: job for job in jobs}
+        results = {}
+        running = {}
+        run_start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while pending or running:
+                for name, job in list(pending.items()):
+                    failed_dependencies = [dep for dep in job['depends_on'] if dep in results and results[dep]['status'] != 'COMPLETED']
+                    if failed_dependencies:
+                        del pending[name]
+                        results[name] = {'status': 'SKIPPED', 'rows': 0, 'seconds': 0.0}
+                        logging.error(f"Job {name} skipped: dependencies failed {failed_dependencies}")
+                        try:
+                            log_engine = etl.db_process.from_get_connection(db_type=job['etl_pr_dml'], ints=1, fm_db=job['etl_pr_dml_db_config'])
+                            if log_engine is not None:
+                                etl.db_process.log_etl_process(log_engine, f"ETL_JOB_{name}", 'FAILED', f"Skipped: dependencies failed {failed_dependencies}",
+                                                               start_time=datetime.now(), end_time=datetime.now(), from_table=job['query'], to_table=job['table_name'])
+                        except Exception as e:
+                            logging.error(f"Could not log skipped job {name}: {e}")
+                    elif all(results.get(dep, {}).get('status') == 'COMPLETED' for dep in job['depends_on']):
+                        del pending[name]
+                        running[executor.submit(JobRunner.run_job, job, db_slots)] = name
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        rows, seconds = future.result()
+                    except Exception as e:
+                        logging.error(f"Job {name} raised: {e}")
+                        rows, seconds = None, 0.0
+                    status = 'COMPLETED' if rows is not None else 'FAILED'
+                    results[name] = {'status': status, 'rows': rows or 0, 'seconds': round(seconds, 2),
+                                     'rows_per_sec': round((rows or 0) / seconds) if seconds > 0 else 0}
+                    logging.info(f"Job {name} {status}: {rows or 0} rows in {seconds:.2f}s "
+                                 f"({len(results)}/{len(jobs)} done)")
+
+        elapsed = time.perf_counter() - run_start
+        JobRunner.log_summary(results, elapsed)
+        return results
+
+    @staticmethod
+    def log_summary(results, elapsed):
+        total_rows = sum(result['rows'] for result in results.values())
+        logging.info(f"{'JOB':<40} {'STATUS':<10} {'ROWS':>12} {'SECONDS':>10} {'ROWS/S':>10}")
+        for name, result in results.items():
+            logging.info(f"{name:<40} {result['status']:<10} {result['rows']:>12} {result['seconds']:>10} {result.get('rows_per_sec', 0):>10}")
+        failed = [name for name, result in results.items() if result['status'] != 'COMPLETED']
+        logging.info(f"Batch finished in {elapsed:.2f}s: {len(results) - len(failed)} completed, {len(failed)} failed/skipped, "
+                     f"{total_rows} rows ({total_rows / elapsed if elapsed > 0 else 0:.0f} rows/s)")
+
+    @staticmethod
+    def main(argv):
+        if not argv or not os.path.exists(argv[0]):
+            logging.error(f"Manifest not found: {argv[0] if argv else None}")
+            return 2
+        results = JobRunner.run_manifest(argv[0])
+        return 0 if all(result['status'] == 'COMPLETED' for result in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(JobRunner.main(sys.argv[1:]))
@@ -0,0 +1,324 @@
+import csv
+import io
+import logging
+import os
+import tempfile
+import time
+import uuid
+import pandas as pd
+from sqlalchemy import text
+import etl_metrics as em
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class db_loader:
+
+    LOADERS = {
+        "Postgresql": "copy_postgresql",
+        "Oracle": "executemany_oracle",
+        "MySql": "insert_mysql",
+        "MariaDB": "insert_mysql",
+        "MSSQL": "fast_executemany_mssql",
+    }
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- helpers
+    @staticmethod
+    def _qualified_name(connection, table_name, schema=None):
+        preparer = connection.dialect.identifier_preparer
+        if schema:
+            return f"{preparer.quote_schema(schema)}.{preparer.quote(table_name)}"
+        return preparer.quote(table_name)
+
+    @staticmethod
+    def _column_list(connection, df):
+        preparer = connection.dialect.identifier_preparer
+        return ", ".join(preparer.quote(str(col)) for col in df.columns)
+
+    @staticmethod
+    def _batches(df, batch_size):
+        # pandas Timestamps are handed over as plain datetimes; some drivers (sqlite3) only adapt the exact datetime type.
+        datetime_columns = [col for col in df.columns if pd.api.types.is_datetime64_any_dtype(df[col].dtype)]
+        for start in range(0, len(df), batch_size):
+            batch = df.iloc[start:start + batch_size]
+            values = batch.astype(object)
+            for col in datetime_columns:
+                values[col] = pd.Series(batch[col].dt.to_pydatetime(), index=batch.index, dtype=object)
+            yield list(values.where(batch.notna(), None).itertuples(index=False, name=None))
+
+    @staticmethod
+    def _oracle_input_sizes(df):
+        # Values past the VARCHAR2/RAW bind limits are bound as LONG / LONG RAW, which Oracle converts into CLOB/BLOB columns.
+        import cx_Oracle
+        sizes, oversized = [], False
+        for col in df.columns:
+            size = None
+            if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype):
+                values = df[col].dropna()
+                if len(values) and isinstance(values.iloc[0], (bytes, bytearray)) and values.map(len).max() > 2000:
+                    size = cx_Oracle.DB_TYPE_LONG_RAW
+                elif len(values) and isinstance(values.iloc[0], str) and values.str.len().max() > 1000:
+                    size = cx_Oracle.DB_TYPE_LONG
+            sizes.append(size)
+            oversized = oversized or size is not None
+        return sizes if oversized else None
+
+    @staticmethod
+    def _count_round_trips(connection, count: int = 1):
+        # Raw DBAPI cursors bypass SQLAlchemy's cursor events, so each batch sent is reported to the run metrics here.
+        em.RunMetrics.record_round_trips(getattr(connection, 'engine', None), count)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- PostgreSQL COPY FROM STDIN
+    @staticmethod
+    def copy_postgresql(df, table_name, connection, schema=None, batch_size: int = 100000):
+        sql = (f"COPY {db_loader._qualified_name(connection, table_name, schema)} ({db_loader._column_list(connection, df)}) "
+               f"FROM STDIN WITH (FORMAT csv, NULL '\\N')")
+        cursor = connection.connection.cursor()
+        try:
+            for start in range(0, len(df), batch_size):
+                buffer = io.StringIO()
+                df.iloc[start:start + batch_size].to_csv(buffer, index=False, header=False, na_rep='\\N')
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                db_loader._count_round_trips(connection)
+        finally:
+            cursor.close()
+        return len(df)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- Oracle array binds
+    @staticmethod
+    def executemany_oracle(df, table_name, connection, schema=None, batch_size: int = 10000):
+        binds = ", ".join(f":{i}" for i in range(1, len(df.columns) + 1))
+        sql = f"INSERT INTO {db_loader._qualified_name(connection, table_name, schema)} ({db_loader._column_list(connection, df)}) VALUES ({binds})"
+        cursor = connection.connection.cursor()
+        try:
+            input_sizes = db_loader._oracle_input_sizes(df)
+            if input_sizes:
+                cursor.setinputsizes(*input_sizes)
+            for rows in db_loader._batches(df, batch_size):
+                cursor.executemany(sql, rows)
+                db_loader._count_round_trips(connection)
+        finally:
+            cursor.close()
+        return len(df)
+
+    @staticmethod
+    def _escape_backslashes(df):
+        # LOAD DATA keeps the default ESCAPED BY '\', so backslashes in values are doubled and only the na_rep \N reads as NULL.
+        text_columns = [col for col in df.columns if df[col].dtype == object or pd.api.types.is_string_dtype(df[col].dtype)]
+        if not text_columns:
+            return df
+        escaped = df.copy(deep=False)
+        for col in text_columns:
+            escaped[col] = df[col].map(lambda value: value.replace('\\', '\\\\') if isinstance(value, str) else value)
+        return escaped
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- MySQL / MariaDB multi-row VALUES or LOAD DATA LOCAL INFILE
+    @staticmethod
+    def insert_mysql(df, table_name, connection, schema=None, batch_size: int = 5000, use_infile: bool = False):
+        table = db_loader._qualified_name(connection, table_name, schema)
+        columns = db_loader._column_list(connection, df)
+        cursor = connection.connection.cursor()
+        try:
+            if use_infile:
+                # Requires local_infile enabled on both the server and the client connection.
+                fd, path = tempfile.mkstemp(suffix='.csv')
+                try:
+                    with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+                        db_loader._escape_backslashes(df).to_csv(f, index=False, header=False, na_rep='\\N', quoting=csv.QUOTE_MINIMAL, lineterminator='\n')
+                    cursor.execute(
+                        f"LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}' INTO TABLE {table} CHARACTER SET utf8mb4 "
+                        f"FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' LINES TERMINATED BY '\\n' ({columns})"
+                    )
+                    db_loader._count_round_trips(connection)
+                finally:
+                    os.remove(path)
+            else:
+                # PyMySQL rewrites executemany on INSERT ... VALUES into multi-row statements.
+                placeholders = ", ".join(["%s"] * len(df.columns))
+                sql = f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+                for rows in db_loader._batches(df, batch_size):
+                    cursor.executemany(sql, rows)
+                    db_loader._count_round_trips(connection)
+        finally:
+            cursor.close()
+        return len(df)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- MSSQL fast_executemany
+    @staticmethod
+    def fast_executemany_mssql(df, table_name, connection, schema=None, batch_size: int = 10000):
+        placeholders = ", ".join(["?"] * len(df.columns))
+        sql = f"INSERT INTO {db_loader._qualified_name(connection, table_name, schema)} ({db_loader._column_list(connection, df)}) VALUES ({placeholders})"
+        cursor = connection.connection.cursor()
+        try:
+            cursor.fast_executemany = True
+            for rows in db_loader._batches(df, batch_size):
+                cursor.executemany(sql, rows)
+                db_loader._count_round_trips(connection)
+        finally:
+            cursor.close()
+        return len(df)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- generic executemany (staging tables on other dialects)
+    @staticmethod
+    def executemany_generic(df, table_name, connection, schema=None, batch_size: int = 10000):
+        binds = ", ".join(f":p{i}" for i in range(len(df.columns)))
+        sql = text(f"INSERT INTO {db_loader._qualified_name(connection, table_name, schema)} ({db_loader._column_list(connection, df)}) VALUES ({binds})")
+        for rows in db_loader._batches(df, batch_size):
+            connection.execute(sql, [{f"p{i}": value for i, value in enumerate(row)} for row in rows])
+        return len(df)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- to_sql fallback
+    @staticmethod
+    def to_sql(df, table_name, connection, schema=None, batch_size: int = None):
+        df.to_sql(table_name, con=connection, schema=schema, if_exists='append', index=False, chunksize=batch_size)
+        return len(df)
+
+    @staticmethod
+    def get_loader(db_type: str, loader: str = 'auto'):
+        if loader == 'auto':
+            return getattr(db_loader, db_loader.LOADERS.get(db_type, 'to_sql'))
+        if loader not in set(db_loader.LOADERS.values()) | {'to_sql', 'executemany_generic'}:
+            raise ValueError(f"Unknown loader '{loader}'; use 'auto', 'to_sql', 'executemany_generic' or one of {sorted(set(db_loader.LOADERS.values()))}")
+        return getattr(db_loader, loader)
+
+    @staticmethod
+    def load_on_connection(df, table_name, connection, db_type: str, schema=None, loader: str = 'auto', **loader_options):
+        load = db_loader.get_loader(db_type, loader)
+        return load(df, table_name, connection, schema=schema, **loader_options)
+
+    @staticmethod
+    def bulk_load(df, table_name, engine, db_type: str, schema=None, loader: str = 'auto', **loader_options):
+        load = db_loader.get_loader(db_type, loader)
+        try:
+            with engine.begin() as connection:
+                rows = load(df, table_name, connection, schema=schema, **loader_options)
+            logging.info(f"Bulk loaded {rows} rows into {table_name} using {load.__name__}")
+            return rows
+        except Exception as e:
+            if load is db_loader.to_sql:
+                raise
+            logging.warning(f"{load.__name__} failed for {table_name} ({e}); falling back to to_sql")
+            with engine.begin() as connection:
+                return db_loader.to_sql(df, table_name, connection, schema=schema)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- benchmark (rows/sec per loader, rolled back)
+    @staticmethod
+    def benchmark(df, table_name, engine, db_type: str, schema=None, loaders: list = None):
+        if loaders is None:
+            loaders = ['to_sql'] + ([db_loader.LOADERS[db_type]] if db_type in db_loader.LOADERS else [])
+
+        results = {}
+        for name in loaders:
+            load = getattr(db_loader, name)
+            with engine.connect() as connection:
+                transaction = connection.begin()
+                try:
+                    start = time.perf_counter()
+                    rows = load(df, table_name, connection, schema=schema)
+                    elapsed = time.perf_counter() - start
+                    results[name] = rows / elapsed if elapsed > 0 else float('inf')
+                    logging.info(f"Loader {name}: {rows} rows in {elapsed:.2f}s ({results[name]:.0f} rows/s)")
+                except Exception as e:
+                    logging.error(f"Loader {name} failed during benchmark: {e}")
+                    results[name] = None
+                finally:
+                    transaction.rollback()
+        return results
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- merge / upsert through a staging table
+    @staticmethod
+    def _create_staging_table(connection, db_type: str, target: str):
+        suffix = uuid.uuid4().hex[:8]
+        if db_type == "Postgresql":
+            staging = f"etl_stg_{suffix}"
+            connection.exec_driver_sql(f"CREATE TEMP TABLE {staging} (LIKE {target} INCLUDING DEFAULTS) ON COMMIT DROP")
+        elif db_type in ["MySql", "MariaDB"]:
+            staging = f"etl_stg_{suffix}"
+            connection.exec_driver_sql(f"CREATE TEMPORARY TABLE {staging} LIKE {target}")
+        elif db_type == "MSSQL":
+            staging = f"#etl_stg_{suffix}"
+            connection.exec_driver_sql(f"SELECT TOP 0 * INTO {staging} FROM {target}")
+        elif db_type == "Oracle":
+            # Private temporary tables (18c+) do not commit the open transaction and vanish on commit.
+            staging = f"ora$ptt_etl_{suffix}"
+            connection.exec_driver_sql(f"CREATE PRIVATE TEMPORARY TABLE {staging} ON COMMIT DROP DEFINITION AS SELECT * FROM {target} WHERE 1 = 0")
+        else:
+            staging = f"etl_stg_{suffix}"
+            connection.exec_driver_sql(f"CREATE TEMP TABLE {staging} AS SELECT * FROM {target} WHERE 1 = 0")
+        return staging
+
+    @staticmethod
+    def _merge_statement(connection, db_type: str, target: str, staging: str, columns: list, key_columns: list):
+        quote = connection.dialect.identifier_preparer.quote
+        column_list = ", ".join(quote(col) for col in columns)
+        update_columns = [col for col in columns if col not in key_columns]
+
+        if db_type in ["Oracle", "MSSQL"]:
+            on_clause = " AND ".join(f"t.{quote(col)} = s.{quote(col)}" for col in key_columns)
+            update_clause = (f" WHEN MATCHED THEN UPDATE SET " + ", ".join(f"t.{quote(col)} = s.{quote(col)}" for col in update_columns)) if update_columns else ""
+            statement = (f"MERGE INTO {target} t USING {staging} s ON ({on_clause}){update_clause}"
+                         f" WHEN NOT MATCHED THEN INSERT ({column_list}) VALUES ({', '.join(f's.{quote(col)}' for col in columns)})")
+            return statement + ";" if db_type == "MSSQL" else statement
+
+        if db_type in ["MySql", "MariaDB"]:
+            update_clause = ", ".join(f"{quote(col)} = VALUES({quote(col)})" for col in (update_columns or key_columns[:1]))
+            return f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} ON DUPLICATE KEY UPDATE {update_clause}"
+
+        conflict = ", ".join(quote(col) for col in key_columns)
+        action = ("DO UPDATE SET " + ", ".join(f"{quote(col)} = EXCLUDED.{quote(col)}" for col in update_columns)) if update_columns else "DO NOTHING"
+        return f"INSERT INTO {target} ({column_list}) SELECT {column_list} FROM {staging} WHERE 1 = 1 ON CONFLICT ({conflict}) {action}"
+
+    @staticmethod
+    def merge_load(df, table_name, engine, db_type: str, key_columns: list, schema=None, loader: str = 'auto', **loader_options):
+        with engine.begin() as connection:
+            return db_loader.merge_on_connection(df, table_name, connection, db_type, key_columns, schema=schema, loader=loader, **loader_options)
+
+    @staticmethod
+    def merge_on_connection(df, table_name, connection, db_type: str, key_columns: list, schema=None, loader: str = 'auto', **loader_options):
+        if not key_columns:
+            raise ValueError("Merge load mode requires key_columns")
+        key_columns = [col.lower() for col in key_columns]
+        missing_keys = set(key_columns) - set(df.columns)
+        if missing_keys:
+            raise ValueError(f"Key columns {missing_keys} are not in the data for {table_name}")
+
+        df = df.drop_duplicates(subset=key_columns, keep='last')
+        stage_loader = db_loader.get_loader(db_type, loader)
+        if stage_loader is db_loader.to_sql:
+            stage_loader = db_loader.executemany_generic
+
+        quote = connection.dialect.identifier_preparer.quote
+        target = db_loader._qualified_name(connection, table_name, schema)
+        staging = db_loader._create_staging_table(connection, db_type, target)
+
+        stage_loader(df, staging, connection, **loader_options)
+
+        key_match = " AND ".join(f"t.{quote(col)} = s.{quote(col)}" for col in key_columns)
+        inserted = connection.exec_driver_sql(
+            f"SELECT COUNT(*) FROM {staging} s WHERE NOT EXISTS (SELECT 1 FROM {target} t WHERE {key_match})"
+        ).scalar()
+
+        connection.exec_driver_sql(db_loader._merge_statement(connection, db_type, target, staging, list(df.columns), key_columns))
+
+        if db_type not in ["Postgresql", "Oracle"]:
+            connection.exec_driver_sql(f"DROP {'TEMPORARY ' if db_type in ['MySql', 'MariaDB'] else ''}TABLE {staging}")
+
+        updated = len(df) - inserted
+        logging.info(f"Merged {len(df)} rows into {table_name} using {stage_loader.__name__}: {inserted} inserted, {updated} updated")
+        return {'inserted': inserted, 'updated': updated}
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- delete by key
+    @staticmethod
+    def delete_keys(keys_df, table_name, connection, key_columns: list, schema=None, batch_size: int = 10000):
+        if keys_df.empty:
+            return 0
+        quote = connection.dialect.identifier_preparer.quote
+        key_columns = [col.lower() for col in key_columns]
+        key_match = " AND ".join(f"{quote(col)} = :p{i}" for i, col in enumerate(key_columns))
+        sql = text(f"DELETE FROM {db_loader._qualified_name(connection, table_name, schema)} WHERE {key_match}")
+        deleted = 0
+        for rows in db_loader._batches(keys_df[key_columns].drop_duplicates(), batch_size):
+            result = connection.execute(sql, [{f"p{i}": value for i, value in enumerate(row)} for row in rows])
+            deleted += max(result.rowcount, 0)
+        logging.info(f"Deleted {deleted} rows from {table_name} by {key_columns}")
+        return deleted
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from sqlalchemy import text
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+ColumnInfo = namedtuple('ColumnInfo', ['name', 'data_type', 'length', 'precision', 'scale', 'nullable', 'position'])
+
+class db_metadata:
+
+    cache_size = 64
+    cache_ttl = 3600
+    cache_dir = None
+    _cache = OrderedDict()
+    _cache_lock = threading.Lock()
+
+    CATALOG_QUERIES = {
+        "Oracle": """
+            SELECT lower(TABLE_NAME) AS TABLE_NAME, lower(COLUMN_NAME) AS COLUMN_NAME, lower(DATA_TYPE) AS DATA_TYPE,
+                CHAR_LENGTH AS DATA_LENGTH, DATA_PRECISION, DATA_SCALE,
+                CASE WHEN NULLABLE = 'Y' THEN 1 ELSE 0 END AS NULLABLE, COLUMN_ID AS POSITION
+            FROM ALL_TAB_COLUMNS
+            WHERE OWNER = :schema_name
+            ORDER BY TABLE_NAME, COLUMN_ID
+        """,
+        "information_schema": """
+            SELECT lower(TABLE_NAME) AS TABLE_NAME, lower(COLUMN_NAME) AS COLUMN_NAME, lower(DATA_TYPE) AS DATA_TYPE,
+                CHARACTER_MAXIMUM_LENGTH AS DATA_LENGTH, NUMERIC_PRECISION AS DATA_PRECISION, NUMERIC_SCALE AS DATA_SCALE,
+                CASE WHEN IS_NULLABLE = 'YES' THEN 1 ELSE 0 END AS NULLABLE, ORDINAL_POSITION AS POSITION
+            FROM information_schema.COLUMNS
+            WHERE lower(TABLE_SCHEMA) = :schema_name
+            ORDER BY TABLE_NAME, ORDINAL_POSITION
+        """,
+    }
+
+    @staticmethod
+    def configure_cache(cache_size: int = None, cache_ttl: int = None, cache_dir: str = None):
+        if cache_size is not None:
+            db_metadata.cache_size = cache_size
+        if cache_ttl is not None:
+            db_metadata.cache_ttl = cache_ttl
+        if cache_dir is not None:
+            os.makedirs(cache_dir, exist_ok=True)
+            db_metadata.cache_dir = cache_dir
+
+    @staticmethod
+    def _cache_key(engine, db_type: str, schema_name: str):
+        return (engine.url.render_as_string(hide_password=True), db_type, schema_name.lower())
+
+    @staticmethod
+    def _disk_path(key):
+        return os.path.join(db_metadata.cache_dir, hashlib.sha1("|".join(key).encode('utf-8')).hexdigest() + '.json')
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- catalog query (one per schema)
+    @staticmethod
+    def load_schema_columns(engine, db_type: str, schema_name: str):
+        if db_type == "Oracle":
+            query, schema_bind = db_metadata.CATALOG_QUERIES["Oracle"], schema_name.upper()
+        elif db_type in ["MySql", "MariaDB", "Postgresql", "MSSQL"]:
+            query, schema_bind = db_metadata.CATALOG_QUERIES["information_schema"], schema_name.lower()
+        else:
+            raise ValueError(f"Unsupported database type for catalog query: {db_type}")
+
+        start = time.perf_counter()
+        tables = {}
+        with engine.connect() as connection:
+            for row in connection.execute(text(query), {'schema_name': schema_bind}):
+                table_name, column_name, data_type, length, precision, scale, nullable, position = row
+                tables.setdefault(table_name, []).append(ColumnInfo(
+                    column_name, data_type,
+                    int(length) if length is not None else None,
+                    int(precision) if precision is not None else None,
+                    int(scale) if scale is not None else None,
+                    bool(nullable), int(position)))
+
+        logging.info(f"Loaded catalog for {db_type} schema {schema_name}: {len(tables)} tables in {time.perf_counter() - start:.2f}s")
+        return tables
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- cache lookups
+    @staticmethod
+    def _read_cache(key):
+        now = time.time()
+        with db_metadata._cache_lock:
+            entry = db_metadata._cache.get(key)
+            if entry and now - entry[0] < db_metadata.cache_ttl:
+                db_metadata._cache.move_to_end(key)
+                return entry[1]
+
+        if db_metadata.cache_dir:
+            path = db_metadata._disk_path(key)
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                if now - stored['loaded_at'] < db_metadata.cache_ttl:
+                    tables = {table: [ColumnInfo(*column) for column in columns] for table, columns in stored['tables'].items()}
+                    db_metadata._write_memory(key, stored['loaded_at'], tables)
+                    return tables
+            except FileNotFoundError:
+                pass
+            except (ValueError, KeyError, TypeError) as e:
+                logging.warning(f"Ignoring unreadable metadata cache file {path}: {e}")
+        return None
+
+    @staticmethod
+    def _write_memory(key, loaded_at, tables):
+        with db_metadata._cache_lock:
+            db_metadata._cache[key] = (loaded_at, tables)
+            db_metadata._cache.move_to_end(key)
+            while len(db_metadata._cache) > db_metadata.cache_size:
+                db_metadata._cache.popitem(last=False)
+
+    @staticmethod
+    def _write_cache(key, tables):
+        loaded_at = time.time()
+        db_metadata._write_memory(key, loaded_at, tables)
+        if db_metadata.cache_dir:
+            path = db_metadata._disk_path(key)
+            temp_path = f"{path}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump({'key': list(key), 'loaded_at': loaded_at, 'tables': tables}, f)
+            os.replace(temp_path, path)
+
+    @staticmethod
+    def invalidate(engine=None, db_type: str = None, schema_name: str = None):
+        with db_metadata._cache_lock:
+            if engine is None:
+                keys = list(db_metadata._cache)
+            else:
+                keys = [db_metadata._cache_key(engine, db_type, schema_name)]
+            for key in keys:
+                db_metadata._cache.pop(key, None)
+                if db_metadata.cache_dir and os.path.exists(db_metadata._disk_path(key)):
+                    os.remove(db_metadata._disk_path(key))
+            if engine is None and db_metadata.cache_dir:
+                for file_name in os.listdir(db_metadata.cache_dir):
+                    if file_name.endswith('.json'):
+                        os.remove(os.path.join(db_metadata.cache_dir, file_name))
+
+    @staticmethod
+    def get_schema_columns(engine, db_type: str, schema_name: str, refresh: bool = False):
+        key = db_metadata._cache_key(engine, db_type, schema_name)
+        tables = None if refresh else db_metadata._read_cache(key)
+        if tables is None:
+            tables = db_metadata.load_schema_columns(engine, db_type, schema_name)
+            db_metadata._write_cache(key, tables)
+        return tables
+
+    @staticmethod
+    def get_table_columns(engine, table_name: str, db_type: str, schema_name: str):
+        tables = db_metadata.get_schema_columns(engine, db_type, schema_name)
+        columns = tables.get(table_name.lower())
+        if columns is None:
+            # The table may have been created after the schema was cached.
+            tables = db_metadata.get_schema_columns(engine, db_type, schema_name, refresh=True)
+            columns = tables.get(table_name.lower(), [])
+        return OrderedDict((column.name, column) for column in columns)
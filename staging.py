@@ -0,0 +1,106 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class ChunkStage:
+
+    def __init__(self, stage_dir: str, file_format: str = 'arrow'):
+        if file_format not in ('arrow', 'parquet'):
+            raise ValueError(f"Unsupported staging format: {file_format}")
+        self.stage_dir = stage_dir
+        self.file_format = file_format
+        self.manifest_path = os.path.join(stage_dir, 'manifest.json')
+        self.manifest = None
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+
+    @staticmethod
+    def _checksum(path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1048576), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def _save_manifest(self):
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=2, default=str)
+        os.replace(temp_path, self.manifest_path)
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- stage state
+    def can_resume(self, source: str, target: str):
+        return (self.manifest is not None and self.manifest.get('extract_complete')
+                and self.manifest.get('source') == source and self.manifest.get('target') == target)
+
+    def reset(self, source: str, target: str):
+        if os.path.exists(self.stage_dir):
+            shutil.rmtree(self.stage_dir)
+        os.makedirs(self.stage_dir)
+        self.manifest = {'source': source, 'target': target, 'format': self.file_format, 'extract_complete': False, 'chunks': [], 'extra': {}}
+        self._save_manifest()
+
+    def mark_extract_complete(self, **extra):
+        self.manifest['extract_complete'] = True
+        self.manifest['extra'].update(extra)
+        self._save_manifest()
+
+    def cleanup(self):
+        shutil.rmtree(self.stage_dir, ignore_errors=True)
+        self.manifest = None
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- write / read chunks
+    def write_chunk(self, df):
+        chunk_no = len(self.manifest['chunks']) + 1
+        file_name = f"chunk_{chunk_no:06d}.{self.file_format}"
+        path = os.path.join(self.stage_dir, file_name)
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        if self.file_format == 'parquet':
+            pq.write_table(table, path)
+        else:
+            with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+
+        self.manifest['chunks'].append({'file': file_name, 'rows': table.num_rows, 'sha256': ChunkStage._checksum(path), 'loaded': False})
+        self._save_manifest()
+        return chunk_no
+
+    def read_chunk(self, entry):
+        path = os.path.join(self.stage_dir, entry['file'])
+        if ChunkStage._checksum(path) != entry['sha256']:
+            raise ValueError(f"Checksum mismatch for staged chunk {path}")
+
+        if self.manifest['format'] == 'parquet':
+            table = pq.read_table(path, memory_map=True)
+        else:
+            with pa.memory_map(path, 'r') as source:
+                table = pa.ipc.open_file(source).read_all()
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def iter_unloaded(self):
+        pending = [entry for entry in self.manifest['chunks'] if not entry['loaded']]
+        loaded = len(self.manifest['chunks']) - len(pending)
+        if loaded:
+            logging.info(f"Resuming from staged chunk {loaded + 1} of {len(self.manifest['chunks'])} in {self.stage_dir}")
+
+        for entry in pending:
+            yield self.read_chunk(entry)
+            # Reached only once the consumer asks for the next chunk, i.e. after this one was loaded.
+            entry['loaded'] = True
+            self._save_manifest()
+
+    def stage_chunks(self, chunks):
+        staged_rows = 0
+        for chunk in chunks:
+            self.write_chunk(chunk)
+            staged_rows += len(chunk)
+        logging.info(f"Staged {staged_rows} rows in {len(self.manifest['chunks'])} chunks under {self.stage_dir}")
+        return staged_rows
@@ -0,0 +1,246 @@
+import logging
+import math
+import time
+import pandas as pd
+from sqlalchemy import text
+import etlprocess as etl
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+class db_validation:
+
+    # Row hashes must be comparable across dialects, so every side hashes the same canonical text with MD5 and keeps 32 bits.
+    HASH_FUNCTIONS = {
+        "Oracle": "TO_NUMBER(SUBSTR(RAWTOHEX(STANDARD_HASH({expr}, 'MD5')), 1, 8), 'XXXXXXXX')",
+        "Postgresql": "('x' || substr(md5({expr}), 1, 8))::bit(32)::bigint",
+        "MySql": "CAST(CONV(SUBSTRING(MD5({expr}), 1, 8), 16, 10) AS UNSIGNED)",
+        "MariaDB": "CAST(CONV(SUBSTRING(MD5({expr}), 1, 8), 16, 10) AS UNSIGNED)",
+        # HASHBYTES hashes the bytes it is given, so the text is converted to UTF-8 through a _UTF8 collation (SQL Server 2019+) to match md5 / STANDARD_HASH.
+        "MSSQL": "CONVERT(BIGINT, CONVERT(BINARY(4), SUBSTRING(HASHBYTES('MD5', CAST({expr} COLLATE Latin1_General_100_CI_AS_SC_UTF8 AS VARCHAR(MAX))), 1, 4)))",
+    }
+    # Without UTF-8 collations only ASCII-safe columns are hashed; string columns are skipped whenever MSSQL is involved.
+    mssql_utf8 = True
+    MSSQL_ASCII_HASH = "CONVERT(BIGINT, CONVERT(BINARY(4), SUBSTRING(HASHBYTES('MD5', CAST({expr} AS VARCHAR(8000))), 1, 4)))"
+
+    # ORA_HASH is much cheaper than STANDARD_HASH but only comparable Oracle to Oracle.
+    NATIVE_HASH_FUNCTIONS = {
+        "Oracle": "ORA_HASH({expr})",
+    }
+
+    # Canonical text per type family: integers as digits, decimals/floats as rounded scaled integers, timestamps to the second,
+    # strings truncated to a prefix (which also turns Oracle CLOBs into VARCHAR2).
+    TEXT_EXPRESSIONS = {
+        "Oracle": {
+            'integer': "TO_CHAR({col})",
+            'scaled': "TO_CHAR(ROUND({col} * {factor}))",
+            'datetime': "TO_CHAR({col}, 'YYYY-MM-DD HH24:MI:SS')",
+            'string': "TO_CHAR(SUBSTR({col}, 1, {prefix}))",
+            'boolean': "TO_CHAR({col})",
+        },
+        "Postgresql": {
+            'integer': "{col}::text",
+            'scaled': "round({col}::numeric * {factor})::numeric(38,0)::text",
+            'datetime': "to_char({col}, 'YYYY-MM-DD HH24:MI:SS')",
+            'string': "substr({col}::text, 1, {prefix})",
+            'boolean': "CASE WHEN {col} THEN '1' WHEN NOT {col} THEN '0' END",
+        },
+        "MySql": {
+            'integer': "CAST({col} AS CHAR)",
+            'scaled': "CAST(CAST(ROUND({col} * {factor}) AS DECIMAL(38,0)) AS CHAR)",
+            'datetime': "DATE_FORMAT({col}, '%Y-%m-%d %H:%i:%s')",
+            'string': "SUBSTRING({col}, 1, {prefix})",
+            'boolean': "CAST({col} AS CHAR)",
+        },
+        "MSSQL": {
+            'integer': "CAST({col} AS VARCHAR(40))",
+            'scaled': "CAST(CAST(ROUND({col} * {factor}, 0) AS DECIMAL(38,0)) AS VARCHAR(40))",
+            'datetime': "CONVERT(VARCHAR(19), {col}, 120)",
+            'string': "CAST({col} AS NVARCHAR({prefix}))",
+            'boolean': "CAST({col} AS VARCHAR(1))",
+        },
+    }
+    TEXT_EXPRESSIONS["MariaDB"] = TEXT_EXPRESSIONS["MySql"]
+
+    SUM_AS_TEXT = {
+        "Oracle": "TO_CHAR(SUM({expr}))",
+        "Postgresql": "SUM({expr})::text",
+        "MySql": "CAST(SUM({expr}) AS CHAR)",
+        "MariaDB": "CAST(SUM({expr}) AS CHAR)",
+        "MSSQL": "CAST(SUM(CAST({expr} AS DECIMAL(38,0))) AS VARCHAR(40))",
+    }
+
+    string_prefix = 1000
+    # Oracle caps SQL VARCHAR2 at 4000 bytes, so the canonical text is hashed in groups of at most this many characters.
+    group_budget = 1000
+    float_scale = 6
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- canonical row hash
+    @staticmethod
+    def build_column_specs(destination_columns: dict, db_type: str = None, skip_strings: bool = False):
+        specs = []
+        for name, meta in destination_columns.items():
+            family = etl.db_process.get_type_family(meta.data_type, db_type, meta.scale)
+            if family == 'binary' or family is None or (skip_strings and family == 'string'):
+                logging.warning(f"Validation skips column {name} ({meta.data_type}): no portable canonical form")
+                continue
+            if family in ('decimal', 'float'):
+                scale = meta.scale if family == 'decimal' and meta.scale is not None else db_validation.float_scale
+                specs.append({'name': name, 'kind': 'integer' if scale == 0 else 'scaled', 'factor': 10 ** scale, 'width': 40})
+            elif family == 'string':
+                specs.append({'name': name, 'kind': 'string', 'width': min(meta.length or db_validation.string_prefix, db_validation.string_prefix)})
+            else:
+                specs.append({'name': name, 'kind': family, 'width': 40 if family != 'datetime' else 19})
+        return specs
+
+    @staticmethod
+    def group_specs(specs):
+        groups, current, width = [], [], 0
+        for spec in specs:
+            if current and width + spec['width'] + 1 > db_validation.group_budget:
+                groups.append(current)
+                current, width = [], 0
+            current.append(spec)
+            width += spec['width'] + 1
+        if current:
+            groups.append(current)
+        return groups
+
+    @staticmethod
+    def concat(db_type: str, parts: list):
+        if db_type in ["MySql", "MariaDB"]:
+            return f"CONCAT_WS('|', {', '.join(parts)})"
+        if db_type == "MSSQL":
+            separator = ", '|', "
+            return f"CONCAT({separator.join(parts)})"
+        return " || '|' || ".join(parts)
+
+    @staticmethod
+    def canonical_groups(db_type: str, groups, null_text: str = ''):
+        templates = db_validation.TEXT_EXPRESSIONS[db_type]
+        expressions = []
+        for group in groups:
+            # Leading '#' keeps the text non-empty, which matters on Oracle where '' is NULL.
+            parts = ["'#'"]
+            for spec in group:
+                cast = templates[spec['kind']].format(col=f"src.{spec['name']}", factor=spec.get('factor', 1), prefix=db_validation.string_prefix)
+                parts.append(f"COALESCE({cast}, '{null_text}')")
+            expressions.append(db_validation.concat(db_type, parts))
+        return expressions
+
+    @staticmethod
+    def hash_expression(db_type: str, group_count: int, native: bool = False):
+        function = (db_validation.NATIVE_HASH_FUNCTIONS if native else db_validation.HASH_FUNCTIONS)[db_type]
+        if db_type == "MSSQL" and not db_validation.mssql_utf8:
+            function = db_validation.MSSQL_ASCII_HASH
+        # Weighted by group position so values moved between column groups still change the row hash.
+        return " + ".join(f"{function.format(expr=f'x.g{i}')} * {i + 1}" for i in range(group_count))
+
+    @staticmethod
+    def row_hash_query(db_type: str, query: str, key_column: str, groups, distinct: bool = False, not_null_columns: list = None,
+                       null_text: str = '', native: bool = False):
+        canonical = db_validation.canonical_groups(db_type, groups, null_text)
+        predicates = " AND ".join([f"src.{key_column} BETWEEN :lo AND :hi"] + [f"src.{col} IS NOT NULL" for col in (not_null_columns or [])])
+        inner = f"SELECT src.{key_column} AS k, {', '.join(f'{expr} AS g{i}' for i, expr in enumerate(canonical))} FROM ({query}) src WHERE {predicates}"
+        if distinct:
+            inner = f"SELECT DISTINCT * FROM ({inner}) d"
+        return f"SELECT x.k AS k, {db_validation.hash_expression(db_type, len(canonical), native)} AS h FROM ({inner}) x"
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- range aggregates
+    @staticmethod
+    def aggregate_ranges(engine, db_type: str, hashed_query: str, lo: int, hi: int, buckets: int, params: dict = None):
+        span = hi - lo + 1
+        bucket = f"FLOOR((y.k - {lo}) * {buckets} / {span})"
+        sql = (f"SELECT {bucket} AS bucket, COUNT(*) AS row_count, {db_validation.SUM_AS_TEXT[db_type].format(expr='y.h')} AS hash_sum "
+               f"FROM ({hashed_query}) y GROUP BY {bucket}")
+        with engine.connect() as connection:
+            rows = connection.execute(text(sql), {**(params or {}), 'lo': lo, 'hi': hi}).fetchall()
+        return {int(row[0]): (int(row[1]), int(row[2] or 0)) for row in rows}
+
+    @staticmethod
+    def bucket_bounds(lo: int, hi: int, buckets: int, bucket: int):
+        span = hi - lo + 1
+        return lo + math.ceil(bucket * span / buckets), lo + math.ceil((bucket + 1) * span / buckets) - 1
+
+    @staticmethod
+    def fetch_row_hashes(engine, hashed_query: str, lo: int, hi: int, params: dict = None):
+        df = pd.read_sql(text(hashed_query), con=engine, params={**(params or {}), 'lo': lo, 'hi': hi})
+        df.columns = df.columns.str.lower()
+        return df.groupby('k')['h'].agg(['count', 'sum'])
+
+    @staticmethod
+    def key_bounds(engine, query: str, key_column: str, params: dict = None):
+        with engine.connect() as connection:
+            row = connection.execute(text(f"SELECT MIN(src.{key_column}), MAX(src.{key_column}) FROM ({query}) src"), params or {}).first()
+        return row[0], row[1]
+
+    #--------------------------------------------------------------------------------------------------------------------------------------------------- validation
+    @staticmethod
+    def validate(source_engine, source_db: str, query: str, target_engine, target_db: str, target_table: str, destination_columns: dict,
+                 key_column: str, buckets: int = 16, leaf_rows: int = 1000, handle_null: str = 'drop', max_report: int = 100,
+                 distinct: bool = True, source_params: dict = None):
+        validation_start = time.perf_counter()
+        key_column = key_column.lower()
+        specs = db_validation.build_column_specs(destination_columns, target_db,
+                                                 skip_strings="MSSQL" in (source_db, target_db) and not db_validation.mssql_utf8)
+        if key_column not in [spec['name'] for spec in specs]:
+            raise ValueError(f"Validation key {key_column} is not one of the loaded columns")
+        groups = db_validation.group_specs(specs)
+        native = source_db == target_db == "Oracle"
+
+        # Mirror transform_data on the source side: with global dedup rows are distinct and, with handle_null='drop', rows with nulls never reach the target.
+        # With per-chunk dedup, duplicates that span chunks are loaded, so the source is compared as is.
+        source_sql = db_validation.row_hash_query(source_db, query, key_column, groups, distinct=distinct,
+                                                  not_null_columns=[spec['name'] for spec in specs] if handle_null == 'drop' else None,
+                                                  null_text='0' if handle_null == 'fill' else '', native=native)
+        target_sql = db_validation.row_hash_query(target_db, f"SELECT * FROM {target_table}", key_column, groups, native=native)
+
+        source_bounds = db_validation.key_bounds(source_engine, query, key_column, source_params)
+        target_bounds = db_validation.key_bounds(target_engine, f"SELECT * FROM {target_table}", key_column)
+        bounds = [value for value in source_bounds + target_bounds if value is not None]
+        report = {'matched': True, 'source_rows': 0, 'target_rows': 0, 'queries': 4, 'mismatched_ranges': [],
+                  'missing_keys': [], 'extra_keys': [], 'changed_keys': []}
+        if not bounds:
+            return report
+        if not all(float(value).is_integer() for value in bounds):
+            raise ValueError(f"Validation key {key_column} must be an integer column")
+
+        pending = [(int(min(bounds)), int(max(bounds)), True)]
+        while pending:
+            lo, hi, top_level = pending.pop()
+            source_ranges = db_validation.aggregate_ranges(source_engine, source_db, source_sql, lo, hi, buckets, source_params)
+            target_ranges = db_validation.aggregate_ranges(target_engine, target_db, target_sql, lo, hi, buckets)
+            report['queries'] += 2
+            if top_level:
+                report['source_rows'] = sum(count for count, _ in source_ranges.values())
+                report['target_rows'] = sum(count for count, _ in target_ranges.values())
+
+            for bucket in sorted(set(source_ranges) | set(target_ranges)):
+                source_count, source_sum = source_ranges.get(bucket, (0, 0))
+                target_count, target_sum = target_ranges.get(bucket, (0, 0))
+                if (source_count, source_sum) == (target_count, target_sum):
+                    continue
+                bucket_lo, bucket_hi = db_validation.bucket_bounds(lo, hi, buckets, bucket)
+                if max(source_count, target_count) > leaf_rows and bucket_hi - bucket_lo + 1 > buckets:
+                    pending.append((bucket_lo, bucket_hi, False))
+                    continue
+
+                report['matched'] = False
+                report['mismatched_ranges'].append((bucket_lo, bucket_hi))
+                source_rows = db_validation.fetch_row_hashes(source_engine, source_sql, bucket_lo, bucket_hi, source_params)
+                target_rows = db_validation.fetch_row_hashes(target_engine, target_sql, bucket_lo, bucket_hi)
+                report['queries'] += 2
+                for name, keys in [('missing_keys', source_rows.index.difference(target_rows.index)),
+                                   ('extra_keys', target_rows.index.difference(source_rows.index))]:
+                    report[name].extend(keys.tolist()[:max_report - len(report[name])])
+                common = source_rows.index.intersection(target_rows.index)
+                changed = common[(source_rows.loc[common] != target_rows.loc[common]).any(axis=1)]
+                report['changed_keys'].extend(changed.tolist()[:max_report - len(report['changed_keys'])])
+
+        elapsed = time.perf_counter() - validation_start
+        if report['matched']:
+            logging.info(f"Validation of {target_table} passed: {report['target_rows']} rows match in {report['queries']} queries ({elapsed:.2f}s)")
+        else:
+            logging.error(f"Validation of {target_table} failed in {elapsed:.2f}s: source {report['source_rows']} rows, target {report['target_rows']} rows, "
+                          f"{len(report['mismatched_ranges'])} mismatched key ranges; missing {report['missing_keys'][:10]}, "
+                          f"extra {report['extra_keys'][:10]}, changed {report['changed_keys'][:10]}")
+        return report